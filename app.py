@@ -2,12 +2,14 @@ import dash
 from dash import dcc, html
 import dash_bootstrap_components as dbc
 from src.pages.main import main_page
+from src.utils.export import register_export_routes
 
 
 
 # Initialize the Dash app.
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
 server = app.server
+register_export_routes(server)
 app.title = "Liam's Language Learning App"
 # app.favicon = path_to_favicon.ico
 
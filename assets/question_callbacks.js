@@ -0,0 +1,38 @@
+// Clientside callbacks of the question modules (src/modules/question_modules).
+// Selecting an answer only restyles the buttons and stores the selection, so it runs in the
+// browser; validating the answer and recording it stay on the server.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    questions: {
+        // Highlights the clicked pick-one-of-four option and stores its index (1..n) as the
+        // selection. Inputs: the n_clicks of every option of the question (pattern-matching ALL)
+        // and the small-buttons flag. Outputs: the option styles, the validate button style, the
+        // selection and the next button's disabled flag.
+        select_answer: function (option_clicks, small_buttons) {
+            const no_update = window.dash_clientside.no_update;
+            const triggered = window.dash_clientside.callback_context.triggered;
+            if (!triggered || !triggered.length || !triggered[0].value) {
+                return [no_update, no_update, no_update, no_update];
+            }
+            // pattern-matching ids are sent as JSON, e.g. '{"index":3,"quiz":"letter",...}.n_clicks'
+            const prop_id = triggered[0].prop_id;
+            const selected = JSON.parse(prop_id.substring(0, prop_id.lastIndexOf("."))).index;
+
+            const default_style = {
+                width: "100%",
+                padding: "10px 12px",
+                textAlign: "center",
+                cursor: "pointer",
+                fontSize: small_buttons === true ? "24px" : "48px",
+            };
+            const selected_style = Object.assign({}, default_style, {
+                backgroundColor: "#cfe8ff",
+                border: "2px solid #0074D9",
+            });
+
+            const styles = option_clicks.map(function (_, i) {
+                return i + 1 === selected ? selected_style : default_style;
+            });
+            return [styles, default_style, selected, true];
+        },
+    },
+});
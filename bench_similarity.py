@@ -0,0 +1,96 @@
+import random
+import sys
+import time
+
+from src.utils.learning_utils import TEXT_ANSWER_MIN_SIMILARITY, check_text_answer_is_valid
+from src.utils.technical_utils import IPA_EQUIVALENTS, levenshtein_distance, normalize_answer, normalize_string
+from src.utils.user_utils import read_user_json
+
+# Micro-benchmark of typed-answer validation (every "type the result" click), against the
+# previous implementation: normalize both strings on every call, then an unbounded Levenshtein,
+# twice per answer. Checks that every answer accepted before still is (answers matching one of the
+# catalog's accepted variants, e.g. "k" for "kh / k", are accepted on top).
+USERNAME = "liam"
+ROUNDS = 20000
+LONG_ROUNDS = 200
+SEED = 1
+
+
+def reference_is_valid(answer: str, truth: str) -> bool:
+    def similarity(a: str, b: str) -> float:
+        a_norm = normalize_string(a, IPA_EQUIVALENTS["thai"])
+        b_norm = normalize_string(b, IPA_EQUIVALENTS["thai"])
+        if a_norm == "chh":
+            a_norm = "ch"
+        if b_norm == "chh":
+            b_norm = "ch"
+        if not a_norm and not b_norm:
+            return 1.0
+        return 1.0 - levenshtein_distance(a_norm, b_norm) / max(len(a_norm), len(b_norm))
+
+    alt_truth = truth.split(" (")[0]
+    return max(similarity(answer, truth), similarity(answer, alt_truth)) >= TEXT_ANSWER_MIN_SIMILARITY
+
+
+def typo(rng: random.Random, s: str, edits: int) -> str:
+    chars = list(s)
+    for _ in range(edits):
+        position = rng.randrange(len(chars) + 1)
+        op = rng.randrange(3)
+        if op == 0 or not chars:
+            chars.insert(position, rng.choice("abcdefghijklmnopqrstuvwxyz "))
+        elif op == 1 and position < len(chars):
+            del chars[position]
+        elif position < len(chars):
+            chars[position] = rng.choice("abcdefghijklmnopqrstuvwxyz ")
+    return "".join(chars)
+
+
+def make_cases(rng: random.Random, truths: list, rounds: int, scale: int) -> list:
+    cases = []
+    for _ in range(rounds):
+        truth = " ".join(rng.choice(truths) for _ in range(scale))
+        kind = rng.randrange(3)
+        if kind == 0:
+            answer = truth  # right
+        elif kind == 1:
+            answer = typo(rng, truth, max(1, len(truth) // 10))  # small typo
+        else:
+            answer = " ".join(rng.choice(truths) for _ in range(scale))  # wrong
+        cases.append((answer, truth))
+    return cases
+
+
+def bench(name: str, check, cases: list) -> tuple:
+    start = time.perf_counter()
+    results = [check(answer, truth) for answer, truth in cases]
+    elapsed = time.perf_counter() - start
+    print(f"  {name:10} {elapsed * 1e6 / len(cases):8.1f} us/answer")
+    return results, elapsed
+
+
+def main() -> int:
+    rng = random.Random(SEED)
+    letters = read_user_json(USERNAME)["thai_letters"]
+    truths = [value for it in letters for value in (it.get("letter_name"), it.get("letter_sound")) if value]
+
+    ok = True
+    for label, cases in (("typical", make_cases(rng, truths, ROUNDS, 1)),
+                         ("long", make_cases(rng, truths, LONG_ROUNDS, 20))):
+        print(f"{label} inputs ({len(cases)} answers, mean length {sum(len(t) for _, t in cases) / len(cases):.0f}):")
+        normalize_answer.cache_clear()
+        expected, before = bench("reference", reference_is_valid, cases)
+        results, after = bench("current", check_text_answer_is_valid, cases)
+        print(f"  speed-up   {before / after:8.1f}x")
+        rejected = sum(e and not r for r, e in zip(results, expected))
+        print(f"  {sum(r and not e for r, e in zip(results, expected))} more answer(s) accepted as variants")
+        if rejected:
+            print(f"  MISMATCH: {rejected} previously accepted answer(s) rejected")
+            ok = False
+
+    print("OK" if ok else "FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
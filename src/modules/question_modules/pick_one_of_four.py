@@ -1,23 +1,41 @@
 from typing import List
 from dash import html, dcc
-from dash import Input, Output, State, callback, callback_context
-from dash import html, no_update
-from src.utils.user_utils import update_user_information_letter, update_user_information_word
+from dash import Input, Output, State, callback, clientside_callback, ClientsideFunction
+from dash import ALL, MATCH, no_update
+from src.utils.user_utils import UserSession
+from src.utils.quiz_plan import get_quiz
+from src.modules.question_modules.question_ids import (
+    CORRECT_COUNT, ITEM, NEXT_BUTTON, OPTION, PICK_VALIDATE, QUIZ_ID, RESULT, SELECTED, SMALL_BUTTONS, TRUTH,
+    question_id,
+)
 
 
-def create_pick_one_of_four(question: str, options: List[str], correct_id: int, instruction:str, prefix: str = "learning-page-question", small_buttons:bool = False, is_letters:bool = False) -> html.Div:
+def _button_style(small_buttons: bool) -> dict:
+    return {
+        "width": "100%",
+        "padding": "10px 12px",
+        "textAlign": "center",
+        "cursor": "pointer",
+        "fontSize": "24px" if small_buttons == True else "48px"
+    }
+
+
+def create_pick_one_of_four(question: str, options: List[str], correct_id: int, instruction:str, small_buttons:bool = False, kind: str = "letter", item_key: str = None) -> html.Div:
     """
-    Create a Dash component for a "pick one of four" question.
+    Create a Dash component for a "pick one of four" question (any number of options works).
 
     - question: question text to display
-    - options: list of 4 answer strings
-    - correct_id: integer 1..4 indicating which button is correct
-    - prefix: id prefix to avoid collisions (buttons will be f"{prefix}-btn-1" .. "-4")
+    - options: list of answer strings (usually 4)
+    - correct_id: integer 1..len(options) indicating which button is correct
+    - kind: item kind asked about ("letter" or "word"); also the quiz the component belongs to
+      (see question_ids), so the learning page of that kind must hold the quiz components
+    - item_key: stable ID (letter char / word) of the item asked about, recorded with the answer
+      (defaults to the correct option's text)
     """
-    if not isinstance(options, (list, tuple)) or len(options) != 4:
-        raise ValueError("options must be a list of exactly 4 strings")
-    if correct_id not in (1, 2, 3, 4):
-        raise ValueError("correct_id must be 1, 2, 3, or 4")
+    if not isinstance(options, (list, tuple)) or len(options) < 2:
+        raise ValueError("options must be a list of at least 2 strings")
+    if correct_id not in range(1, len(options) + 1):
+        raise ValueError(f"correct_id must be between 1 and {len(options)}")
 
     grid_style = {
         "display": "grid",
@@ -25,24 +43,15 @@ def create_pick_one_of_four(question: str, options: List[str], correct_id: int,
         "gap": "8px",
         "marginTop": "8px"
     }
-    btn_style = {
-        "width": "100%",
-        "padding": "10px 12px",
-        "textAlign": "center",
-        "cursor": "pointer",
-        "fontSize": "48px"
-    }
-    if small_buttons == True:
-        btn_style["fontSize"] = "24px"
+    btn_style = _button_style(small_buttons)
 
     # Buttons: include a data-index attribute and a className so callbacks can toggle a "selected" class/style.
     buttons = []
     for i, text in enumerate(options, start=1):
-        btn_id = f"{prefix}-btn-{i}"
         buttons.append(
             html.Button(
                 text,
-                id=btn_id,
+                id=question_id(OPTION, kind, i),
                 n_clicks=0,
                 style=btn_style,
                 className="learning-page-question-btn",
@@ -50,154 +59,120 @@ def create_pick_one_of_four(question: str, options: List[str], correct_id: int,
             )
         )
 
-    # Store the correct answer id (1..4) and the user's current selection.
-    truth_store = dcc.Store(id=f"{prefix}-truth", data=int(correct_id))
-    selected_store = dcc.Store(id=f"{prefix}-selected", data=None)
-    letter_in_question = dcc.Store(id="letter-in-question", data=options[correct_id - 1])
-    small_buttons_store = dcc.Store(id="small-buttons-store", data=small_buttons)
-    is_letters_store = dcc.Store(id="is-letters-store", data=is_letters)
+    # Store the correct answer id (1..n), the user's current selection and the item asked about.
+    truth_store = dcc.Store(id=question_id(TRUTH, kind), data=int(correct_id))
+    selected_store = dcc.Store(id=question_id(SELECTED, kind), data=None)
+    item_store = dcc.Store(id=question_id(ITEM, kind), data=item_key if item_key is not None else options[correct_id - 1])
+    small_buttons_store = dcc.Store(id=question_id(SMALL_BUTTONS, kind), data=small_buttons)
 
     # Validate button to trigger checking the answer; result_div can show feedback.
     validate_button = html.Button(
         "Validate",
-        id=f"{prefix}-one-four-validate",
+        id=question_id(PICK_VALIDATE, kind),
         n_clicks=0,
         style={"marginTop": "12px", "width": "100%", "padding": "10px 12px"}
     )
-    result_div = html.Div("", id=f"{prefix}-result", style={"marginTop": "8px", "fontWeight": "600"})
+    result_div = html.Div("", id=question_id(RESULT, kind), style={"marginTop": "8px", "fontWeight": "600"})
 
     container = html.Div(
         [
-            html.H1(question, id=f"{prefix}-question", style={"fontWeight": "600", "textAlign": "center"}),
-            html.Div(instruction, id=f"{prefix}-instruction", style={"fontWeight": "400", "textAlign": "center"}),
-            html.Div(buttons, style=grid_style, id=f"{prefix}-grid"),
+            html.H1(question, style={"fontWeight": "600", "textAlign": "center"}),
+            html.Div(instruction, style={"fontWeight": "400", "textAlign": "center"}),
+            html.Div(buttons, style=grid_style),
             validate_button,
             result_div,
             # stores (hidden)
             truth_store,
             selected_store,
-            letter_in_question,
+            item_store,
             small_buttons_store,
-            is_letters_store,
         ],
-        id=f"{prefix}-container",
         style={"maxWidth": "600px"}
     )
 
     return container
 
 
-# Callback for the default prefix "learning-page-question". Highlights the clicked button and stores the selection.
+# Selecting an answer runs in the browser (assets/question_callbacks.js): it highlights the
+# clicked button and stores the selection. One registration serves every quiz (MATCH).
+clientside_callback(
+    ClientsideFunction(namespace="questions", function_name="select_answer"),
+    Output(question_id(OPTION, MATCH, ALL), "style", allow_duplicate=True),
+    Output(question_id(PICK_VALIDATE, MATCH), "style", allow_duplicate=True),
+    Output(question_id(SELECTED, MATCH), "data", allow_duplicate=True),
+    Output(question_id(NEXT_BUTTON, MATCH), "disabled", allow_duplicate=True),
+    Input(question_id(OPTION, MATCH, ALL), "n_clicks"),
+    State(question_id(SMALL_BUTTONS, MATCH), "data"),
+    prevent_initial_call=True,
+)
+
+
+# Validates the selected answer, shows the right one and records the answer.
 @callback(
-    Output("learning-page-question-btn-1", "style", allow_duplicate=True),
-    Output("learning-page-question-btn-2", "style", allow_duplicate=True),
-    Output("learning-page-question-btn-3", "style", allow_duplicate=True),
-    Output("learning-page-question-btn-4", "style", allow_duplicate=True),
-    Output("learning-page-question-one-four-validate", "style", allow_duplicate=True),
-    Output("learning-page-question-selected", "data", allow_duplicate=True),
-    Output("next-question-button", "disabled", allow_duplicate=True),
-    Output("num-questions-correct", "data", allow_duplicate=True),
-    Input("learning-page-question-btn-1", "n_clicks"),
-    Input("learning-page-question-btn-2", "n_clicks"),
-    Input("learning-page-question-btn-3", "n_clicks"),
-    Input("learning-page-question-btn-4", "n_clicks"),
-    Input("learning-page-question-one-four-validate", "n_clicks"),
-    State("learning-page-question-selected", "data"),
-    State("learning-page-question-truth", "data"),
-    State("num-questions-correct", "data"),
-    State("letter-in-question", "data"),
-    State("username-store", "data"),
-    State("small-buttons-store", "data"),
-    State("is-letters-store", "data"),
+    Output(question_id(OPTION, MATCH, ALL), "style", allow_duplicate=True),
+    Output(question_id(PICK_VALIDATE, MATCH), "style", allow_duplicate=True),
+    Output(question_id(NEXT_BUTTON, MATCH), "disabled", allow_duplicate=True),
+    Output(question_id(CORRECT_COUNT, MATCH), "data", allow_duplicate=True),
+    Input(question_id(PICK_VALIDATE, MATCH), "n_clicks"),
+    State(question_id(OPTION, MATCH, ALL), "id"),
+    State(question_id(SELECTED, MATCH), "data"),
+    State(question_id(TRUTH, MATCH), "data"),
+    State(question_id(CORRECT_COUNT, MATCH), "data"),
+    State(question_id(ITEM, MATCH), "data"),
+    State(question_id(QUIZ_ID, MATCH), "data"),
+    State(question_id(SMALL_BUTTONS, MATCH), "data"),
     prevent_initial_call=True,
 )
-def _highlight_pick_one(n1, n2, n3, n4, validate_clicks, selected, truth, num_correct, letter_in_question, username, small_buttons, is_letters):
-    # print("Pick one of Four callback active")
-    default_style = {
-        "width": "100%",
-        "padding": "10px 12px",
-        "textAlign": "center",
-        "cursor": "pointer",
-        "fontSize": "48px"
+def _validate_pick_one(validate_clicks, option_ids, selected, truth, num_correct, item_key, quiz_id, small_buttons):
+    if not validate_clicks:
+        return no_update, no_update, no_update, no_update
+
+    # On validate click, make buttons non-interactive and don't change the stored selection.
+    unclickable_style = {
+        **_button_style(small_buttons),
+        "cursor": "default",
+        "backgroundColor": "#f0f0f0",
+        "color": "#7a7a7a",
+        "border": "1px solid #d0d0d0",
+        "opacity": "0.9",
+        "pointerEvents": "none",
     }
-    if small_buttons == True:
-        default_style["fontSize"] = "24px"
-    selected_style = {**default_style, "backgroundColor": "#cfe8ff", "border": "2px solid #0074D9"}
-
-    ctx = callback_context
-
-    # If the validate button has been clicked, make buttons non-interactive and don't change the stored selection.
-    if "-btn-" in ctx.triggered[0]["prop_id"].split(".")[0]:
-        triggered = ctx.triggered[0]["prop_id"].split(".")[0]
-        sel = None
-        if triggered.endswith("-btn-1"):
-            sel = 1
-        elif triggered.endswith("-btn-2"):
-            sel = 2
-        elif triggered.endswith("-btn-3"):
-            sel = 3
-        elif triggered.endswith("-btn-4"):
-            sel = 4
-
-        styles = []
-        for i in range(1, 5):
-            styles.append(selected_style if sel == i else default_style)
-        return styles[0], styles[1], styles[2], styles[3], default_style, sel, True, no_update
-    
-    elif "learning-page-question-one-four-validate" in ctx.triggered[0]["prop_id"].split(".")[0] and validate_clicks > 0:
-        # On validate click, do not change styles or selection.
-        unclickable_style = {
-            "width": "100%",
-            "padding": "10px 12px",
-            "textAlign": "center",
-            "cursor": "default",
-            "backgroundColor": "#f0f0f0",
-            "color": "#7a7a7a",
-            "border": "1px solid #d0d0d0",
-            "opacity": "0.9",
-            "pointerEvents": "none",
-            "fontSize": "48px"
-        }
-        if small_buttons == True:
-            unclickable_style["fontSize"] = "24px"
-        correct_style = {**unclickable_style, "backgroundColor": "#d4ffd4", "border": "2px solid #2ecc40"}
-        incorrect_style = {**unclickable_style, "backgroundColor": "#ffd4d4", "border": "2px solid #ff4136"}
-
-        # initialize distinct style dicts for each button
-        styles = [unclickable_style.copy() for _ in range(4)]
-
-        if selected is None:
-            return styles[0], styles[1], styles[2], styles[3], unclickable_style, no_update, False, no_update
-
-        try:
-            sel_idx = int(selected)
-        except Exception:
-            return styles[0], styles[1], styles[2], styles[3], unclickable_style, no_update, False, no_update
-
-        try:
-            correct_idx = int(truth) if truth is not None else None
-        except Exception:
-            correct_idx = None
-
-        # If selection is correct: make that button green
-        is_correct = False
-        if correct_idx is not None and sel_idx == correct_idx:
-            is_correct = True
-            if 1 <= sel_idx <= 4:
-                styles[sel_idx - 1] = correct_style
-            num_correct += 1
-        else:
-            # mark selected red (if valid)
-            if 1 <= sel_idx <= 4:
-                styles[sel_idx - 1] = incorrect_style
-            # mark actual correct answer green (if known)
-            if correct_idx is not None and 1 <= correct_idx <= 4:
-                styles[correct_idx - 1] = correct_style
-        
-        # update letter statistics
-        update_user_information_letter(username, letter_in_question, is_correct)
-
-        return styles[0], styles[1], styles[2], styles[3], unclickable_style, no_update, False, num_correct
-
-
-    
+    correct_style = {**unclickable_style, "backgroundColor": "#d4ffd4", "border": "2px solid #2ecc40"}
+    incorrect_style = {**unclickable_style, "backgroundColor": "#ffd4d4", "border": "2px solid #ff4136"}
+
+    # initialize distinct style dicts for each button
+    num_options = len(option_ids)
+    styles = [unclickable_style.copy() for _ in range(num_options)]
+
+    try:
+        sel_idx = int(selected)
+    except (TypeError, ValueError):
+        return styles, unclickable_style, False, no_update
+
+    try:
+        correct_idx = int(truth) if truth is not None else None
+    except (TypeError, ValueError):
+        correct_idx = None
+
+    # If selection is correct: make that button green
+    is_correct = False
+    if correct_idx is not None and sel_idx == correct_idx:
+        is_correct = True
+        if 1 <= sel_idx <= num_options:
+            styles[sel_idx - 1] = correct_style
+        num_correct += 1
+    else:
+        # mark selected red (if valid)
+        if 1 <= sel_idx <= num_options:
+            styles[sel_idx - 1] = incorrect_style
+        # mark actual correct answer green (if known)
+        if correct_idx is not None and 1 <= correct_idx <= num_options:
+            styles[correct_idx - 1] = correct_style
+
+    # update item statistics of the quiz's user (the quiz is named after the kind of item it asks about)
+    quiz = get_quiz(quiz_id)
+    if quiz is not None:
+        with UserSession(quiz["username"]) as session:
+            session.record_answer(option_ids[0]["quiz"], item_key, is_correct)
+
+    return styles, unclickable_style, False, num_correct
@@ -0,0 +1,34 @@
+# Pattern-matching component IDs shared by the question modules and the learning pages.
+# Every ID carries the quiz it belongs to ("quiz": the item kind, e.g. "letter" or "word"), so a
+# single MATCH callback per question type serves every quiz page; option buttons also carry
+# their 1-based "index".
+
+# Components of the learning page hosting the questions (see src/pages/quiz_page.py)
+NEXT_BUTTON = "quiz-next-button"
+CORRECT_COUNT = "quiz-correct-count"
+START_BUTTON = "quiz-start-button"
+FINISH_BUTTON = "quiz-finish-button"
+QUESTION_HEADER = "quiz-question-header"
+QUESTION_CONTAINER = "quiz-question-container"
+QUESTION_INDEX = "quiz-question-index"
+TOTAL_QUESTIONS = "quiz-total-questions"
+QUIZ_ID = "quiz-id"
+
+# Components of a question
+OPTION = "question-option"
+SELECTED = "question-selected"
+TRUTH = "question-truth"
+ITEM = "question-item"
+SMALL_BUTTONS = "question-small-buttons"
+PICK_VALIDATE = "question-pick-validate"
+LANGUAGE = "question-language"
+TYPED_INPUT = "question-typed-input"
+TYPED_VALIDATE = "question-typed-validate"
+RESULT = "question-result"
+
+
+def question_id(component: str, quiz: str, index: int = None) -> dict:
+    """Returns the ID of a question (or learning page) component of the given quiz."""
+    if index is None:
+        return {"type": component, "quiz": quiz}
+    return {"type": component, "quiz": quiz, "index": index}
@@ -1,19 +1,28 @@
-from typing import List
 from dash import html, dcc
-from dash import Input, Output, State, callback, callback_context
-from dash import html, no_update
-from src.utils.user_utils import update_user_information_letter, update_user_information_word
+from dash import Input, Output, State, callback
+from dash import MATCH, no_update
+from src.utils.user_utils import UserSession
+from src.utils.catalog import DEFAULT_LANGUAGE
 from src.utils.learning_utils import check_text_answer_is_valid
+from src.utils.quiz_plan import get_quiz
+from src.modules.question_modules.question_ids import (
+    CORRECT_COUNT, ITEM, LANGUAGE, NEXT_BUTTON, QUIZ_ID, RESULT, TRUTH, TYPED_INPUT, TYPED_VALIDATE, question_id,
+)
 
 
-def create_type_the_result(question: str, correct_answer: str, instruction:str, prefix: str = "learning-page-question", is_letters:bool = True) -> html.Div:
+def create_type_the_result(question: str, correct_answer: str, instruction:str, kind: str = "letter", item_key: str = None,
+                           language: str = DEFAULT_LANGUAGE) -> html.Div:
     """
     Create a Dash component for a "type the result" question.
 
     - question: question text to display
     - correct_answer: the expected answer string (case-insensitive)
     - instruction: additional instructions to display below the question
-    - prefix: id prefix to avoid collisions (input will be f"{prefix}-input", validate button will be f"{prefix}-validate")
+    - kind: item kind asked about ("letter" or "word"); also the quiz the component belongs to
+      (see question_ids), so the learning page of that kind must hold the quiz components
+    - item_key: stable ID (letter char / word) of the item asked about, recorded with the answer
+      (defaults to the question text)
+    - language: language of the answer, whose spelling variants are accepted
     """
     input_style = {
         "width": "100%",
@@ -24,7 +33,7 @@ def create_type_the_result(question: str, correct_answer: str, instruction:str,
 
     # Input field for user's answer
     answer_input = dcc.Input(
-        id=f"{prefix}-input",
+        id=question_id(TYPED_INPUT, kind),
         type="text",
         placeholder="Type your answer here",
         value="",
@@ -32,20 +41,19 @@ def create_type_the_result(question: str, correct_answer: str, instruction:str,
         debounce=True  # Trigger change on blur or enter, not every keystroke
     )
 
-    # Store the correct answer and user's current input
-    truth_store = dcc.Store(id=f"{prefix}-truth", data=correct_answer.lower())
-    user_input_store = dcc.Store(id=f"{prefix}-user-input", data="")
-    question_store = dcc.Store(id="letter-in-question", data=question)
-    is_letters_store = dcc.Store(id="is-letters-store", data=is_letters)
+    # Store the correct answer, its language and the item asked about
+    truth_store = dcc.Store(id=question_id(TRUTH, kind), data=correct_answer.lower())
+    language_store = dcc.Store(id=question_id(LANGUAGE, kind), data=language)
+    item_store = dcc.Store(id=question_id(ITEM, kind), data=item_key if item_key is not None else question)
 
     # Validate button to trigger checking the answer; result_div can show feedback.
     validate_button = html.Button(
         "Validate",
-        id=f"{prefix}-complete-let-validate",
+        id=question_id(TYPED_VALIDATE, kind),
         n_clicks=0,
         style={"marginTop": "12px", "width": "100%", "padding": "10px 12px"}
     )
-    result_div = html.Div(id=f"{prefix}-result", style={"marginTop": "8px", "minHeight": "24px"})
+    result_div = html.Div(id=question_id(RESULT, kind), style={"marginTop": "8px", "minHeight": "24px"})
 
     return html.Div([
         html.Div(question, style={"fontSize": "24px", "fontWeight": "bold"}),
@@ -54,30 +62,30 @@ def create_type_the_result(question: str, correct_answer: str, instruction:str,
         validate_button,
         result_div,
         truth_store,
-        user_input_store,
-        question_store,
-        is_letters_store,
+        language_store,
+        item_store,
     ])
 
 
+# Checks the typed answer and records it. One registration serves every quiz (MATCH).
 @callback(
-    Output("learning-page-question-complete-let-validate", "style", allow_duplicate=True),
-    Output("next-question-button", "disabled", allow_duplicate=True),
-    Output("num-questions-correct", "data", allow_duplicate=True),
-    Output("learning-page-question-result", "children", allow_duplicate=True),
-    Input("learning-page-question-complete-let-validate", "n_clicks"),
-    State("learning-page-question-input", "value"),
-    State("learning-page-question-truth", "data"),
-    State("num-questions-correct", "data"),
-    State("letter-in-question", "data"),
-    State("username-store", "data"),
-    State("is-letters-store", "data"),
+    Output(question_id(TYPED_VALIDATE, MATCH), "style", allow_duplicate=True),
+    Output(question_id(NEXT_BUTTON, MATCH), "disabled", allow_duplicate=True),
+    Output(question_id(CORRECT_COUNT, MATCH), "data", allow_duplicate=True),
+    Output(question_id(RESULT, MATCH), "children", allow_duplicate=True),
+    Input(question_id(TYPED_VALIDATE, MATCH), "n_clicks"),
+    State(question_id(TYPED_VALIDATE, MATCH), "id"),
+    State(question_id(TYPED_INPUT, MATCH), "value"),
+    State(question_id(TRUTH, MATCH), "data"),
+    State(question_id(LANGUAGE, MATCH), "data"),
+    State(question_id(CORRECT_COUNT, MATCH), "data"),
+    State(question_id(ITEM, MATCH), "data"),
+    State(question_id(QUIZ_ID, MATCH), "data"),
     prevent_initial_call=True
 )
-def _check_result(n_clicks, user_input, ground_truth, num_questions_correct, question_letter, username, is_letters):
-    # print("Complete text callback active")
-    ctx = callback_context
-    # print(ctx.triggered[0])
+def _check_result(n_clicks, validate_id, user_input, ground_truth, language, num_questions_correct, item_key, quiz_id):
+    if not n_clicks:
+        return no_update, no_update, no_update, no_update
 
     unclickable_style = {
         "width": "100%",
@@ -111,31 +119,18 @@ def _check_result(n_clicks, user_input, ground_truth, num_questions_correct, que
         "color": "#ff0000",
     }
 
-    if "learning-page-question-complete-let-validate" in ctx.triggered[0]["prop_id"].split(".")[0] and n_clicks > 0:
-        # print("Validate button clicked")
-        # check answer is valid
-        # print("User input :", user_input)
-        result = check_text_answer_is_valid(user_input, ground_truth)
-        # print(f"Provided answer is {result}")
-
-        style = false_style
-        text = html.P("")
-
-        if result == True:
-            text = html.P(children=f"Yes! The answer is {ground_truth} !", style=correct_style)
-            num_questions_correct = num_questions_correct + 1
-
-        else:
-            text = html.P(children=f"Sorry, the correct answer is {ground_truth}", style=false_style)
-
-        if is_letters:
-            update_user_information_letter(username, question_letter, result)
-        else:
-            update_user_information_word(username, question_letter, result)
-
-        return unclickable_style, False, num_questions_correct, text
+    result = check_text_answer_is_valid(user_input or "", ground_truth, language or DEFAULT_LANGUAGE)
 
+    if result == True:
+        text = html.P(children=f"Yes! The answer is {ground_truth} !", style=correct_style)
+        num_questions_correct = num_questions_correct + 1
     else:
-        # print("No update")
-        return no_update, no_update, no_update, no_update
+        text = html.P(children=f"Sorry, the correct answer is {ground_truth}", style=false_style)
+
+    # answers go to the quiz's user; the quiz is named after the kind of item it asks about
+    quiz = get_quiz(quiz_id)
+    if quiz is not None:
+        with UserSession(quiz["username"]) as session:
+            session.record_answer(validate_id["quiz"], item_key, result)
 
+    return unclickable_style, False, num_questions_correct, text
@@ -1,13 +1,18 @@
 from dash import html, dcc, callback, Input, Output, State
-from src.utils.user_utils import get_global_learning_statistics, get_thai_letters_learning_statistics, get_thai_words_learning_statistics, read_user_json, save_user_json
+from src.utils.user_utils import UserSession
+from src.utils.export import export_url
 import json
-import urllib.parse
 import base64
 
 
 def dashboard_page(user_name):
 
-    statistics = get_global_learning_statistics(user_name)
+    # a single load of the user's document serves every statistic below
+    with UserSession(user_name) as session:
+        statistics = session.statistics
+        letter_counts = session.count_items("letter")
+        word_counts = session.count_items("word")
+
     total_sessions = statistics.get("total_sessions", 0)
     total_questions = statistics.get("total_questions", 0)
     total_correct = statistics.get("total_correct", 0)
@@ -15,23 +20,18 @@ def dashboard_page(user_name):
     total_accuracy = (total_correct / total_questions) if total_questions > 0 else 0.0
     accuracy_pct = round(total_accuracy * 100, 1)
 
-    thai_letters_statistics = get_thai_letters_learning_statistics(user_name)
-    num_learned_letters = thai_letters_statistics.get("learned_letters", 0)
-    total_letters = thai_letters_statistics.get("total_letters", 0)
+    num_learned_letters = letter_counts["seen"]
+    total_letters = letter_counts["total"]
     letters_learned_pct = (num_learned_letters / total_letters * 100) if total_letters > 0 else 0.0
 
-    thai_words_statistics = get_thai_words_learning_statistics(user_name)
-    num_learned_words = thai_words_statistics.get("learned_words", 0)
-    total_words = thai_words_statistics.get("total_words", 0)
+    num_learned_words = word_counts["seen"]
+    total_words = word_counts["total"]
     words_learned_pct = (num_learned_words / total_words * 100) if total_words > 0 else 0.0
 
-    user_json = read_user_json(user_name)
-    json_str = json.dumps(user_json, ensure_ascii=False, indent=2)
-    data_uri = "data:application/json;charset=utf-8," + urllib.parse.quote(json_str)
-
+    # the export is only built when the link is followed (see src/utils/export.py)
     download_button = html.A(
         "Download your data",
-        href=data_uri,
+        href=export_url(user_name),
         download=f"{user_name}.json",
         style={
             "display": "inline-block",
@@ -132,7 +132,12 @@ def handle_upload(contents, filename, user_info):
         content_string = contents.split(',')[1]
         print(base64.b64decode(content_string)[:100])  # Print the first 100 characters of the content for debugging
         decoded = json.loads(base64.b64decode(content_string))
-        save_user_json(user_name, decoded)
+        with UserSession(user_name) as session:
+            session.replace(decoded)
+            saved = session.commit()
+        if not saved:
+            # unknown user, or the document could not be written
+            return "✗ Upload failed: your data could not be saved."
         return "✓ Data uploaded successfully!"
     except Exception as e:
         return f"✗ Upload failed: {str(e)}"
\ No newline at end of file
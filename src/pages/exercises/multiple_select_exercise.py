@@ -1,8 +1,14 @@
-import dash
-from dash import html, dcc, Input, Output, State, callback, callback_context, no_update
+from src.modules.question_modules.pick_one_of_four import create_pick_one_of_four
 
+# These exercises are pick-one-of-four questions: selection, validation and answer recording are
+# handled by the pattern-matching callbacks of the pick_one_of_four module, so the page showing
+# them must hold the quiz components of question_ids (like the learning pages do).
 
 
+def _correct_id(options) -> int:
+    # options flag the right answer with "is_correct"; ids are 1-based
+    return next((i for i, option in enumerate(options, start=1) if option.get("is_correct")), 1)
+
 
 def multiple_select_exercise_letter(input_letter, options, learning_mode):
     mapping = {
@@ -17,26 +23,15 @@ def multiple_select_exercise_letter(input_letter, options, learning_mode):
         raise ValueError("Unsupported learning mode")
     question_field, answer_field = mapping[learning_mode]
 
-    layout = html.Div([
-        # Display the input letter based on learning mode
-        html.H3(input_letter.get(question_field, "")),
-        # Hidden store to save the selected option index
-        dcc.Store(id="selected-option", data=None),
-        # Option buttons showing the appropriate field
-        html.Div([
-            html.Button(
-                option.get(answer_field, ""),
-                id=f"option-{i}",
-                n_clicks=0,
-                style={"margin": "5px", "padding": "10px"}
-            ) for i, option in enumerate(options)
-        ]),
-        # Button to check the answer
-        html.Br(),
-        html.Button("Check", id="check-button", n_clicks=0, style={"margin": "10px", "padding": "10px"}),
-        html.Div(id="result", style={"marginTop": "10px", "fontWeight": "bold"})
-    ])
-    return layout
+    return create_pick_one_of_four(
+        question=input_letter.get(question_field, ""),
+        options=[option.get(answer_field, "") for option in options],
+        correct_id=_correct_id(options),
+        instruction="",
+        small_buttons=answer_field == "letter_name",
+        kind="letter",
+        item_key=input_letter.get("letter_char"),
+    )
 
 
 def multiple_select_exercise_word(input_word, options, learning_mode):
@@ -53,73 +48,12 @@ def multiple_select_exercise_word(input_word, options, learning_mode):
     def format_field(value):
         return " ".join(value) if isinstance(value, list) else value
 
-    question_text = format_field(input_word.get(question_field, ""))
-
-    layout = html.Div([
-        html.H3(question_text),
-        dcc.Store(id="selected-option", data=None),
-        html.Div([
-            html.Button(
-                format_field(option.get(answer_field, "")),
-                id=f"option-{i}",
-                n_clicks=0,
-                style={"margin": "5px", "padding": "10px"}
-            )
-            for i, option in enumerate(options)
-        ]),
-        html.Br(),
-        html.Button("Check", id="check-button", n_clicks=0, style={"margin": "10px", "padding": "10px"}),
-        html.Div(id="result", style={"marginTop": "10px", "fontWeight": "bold"})
-    ])
-    return layout
-
-
-# Callback to update the selected option in the Store when an option button is clicked
-callback(
-    Output("selected-option", "data"),
-    Input("option-0", "n_clicks"),
-    Input("option-1", "n_clicks"),
-    Input("option-2", "n_clicks"),
-    Input("option-3", "n_clicks"),
-    State("selected-option", "data")
-)
-def update_selection(n0, n1, n2, n3, stored):
-    ctx = callback_context
-    if not ctx.triggered:
-        return stored
-    button_id = ctx.triggered[0]["prop_id"].split(".")[0]
-    try:
-        selected_index = int(button_id.split("-")[1])
-        return selected_index
-    except Exception:
-        return stored
-
-# Callback to check answer and update button styles and display result
-callback(
-    Output("option-0", "style"),
-    Output("option-1", "style"),
-    Output("option-2", "style"),
-    Output("option-3", "style"),
-    Output("result", "children"),
-    Input("check-button", "n_clicks"),
-    State("selected-option", "data")
-)
-def check_answer(n_clicks, selected_index):
-    if n_clicks == 0 or selected_index is None:
-        return (no_update, no_update, no_update, no_update, "")
-    correct_index = next((i for i, option in enumerate(options) if option.get("is_correct")), None)
-    
-    base_style = {"margin": "5px", "padding": "10px", "pointerEvents": "none", "backgroundColor": "lightgrey"}
-    styles = [base_style.copy() for _ in range(4)]
-    result_msg = ""
-
-    if selected_index == correct_index:
-        styles[correct_index]["backgroundColor"] = "lightgreen"
-        result_msg = "Correct!"
-    else:
-        styles[selected_index]["backgroundColor"] = "salmon"
-        if correct_index is not None:
-            styles[correct_index]["backgroundColor"] = "lightgreen"
-        result_msg = "Incorrect!"
-
-    return (*styles, result_msg)
+    return create_pick_one_of_four(
+        question=format_field(input_word.get(question_field, "")),
+        options=[format_field(option.get(answer_field, "")) for option in options],
+        correct_id=_correct_id(options),
+        instruction="",
+        small_buttons=True,
+        kind="word",
+        item_key=input_word.get("word"),
+    )
@@ -1,13 +1,12 @@
 import dash
 import dash_bootstrap_components as dbc
 from dash import dcc, html, callback, Input, State
-from src.utils.learning_utils import load_thai_json_as_list
-from src.utils.user_utils import add_user_settings, read_user_json
+from src.utils.user_utils import UserSession
 from dash import html
 from flask import request
 
 
-def render_card(item, is_letter=True):
+def render_card(item, is_letter=True, stats=None):
     if is_letter:
         title = f"{item.get('letter_name')} ({item.get('letter_char')})"
         details = [
@@ -19,13 +18,15 @@ def render_card(item, is_letter=True):
             html.Div(item.get("pronunciation"), style={'fontSize': '12px', 'color': '#555', 'lineHeight': '1.2'})
         ]
 
-    # stats
+    # stats (precomputed for every card at once by ProgressTable.card_stats when given)
     # print(item)
-    last20 = item.get('last_20_answers', []) or []
-    total = len(last20)
-    correct = sum(1 for v in last20 if v)
+    if stats is None:
+        last20 = item.get('last_20_answers', []) or []
+        stats = {"total": len(last20), "correct": sum(1 for v in last20 if v), "times_learned": item.get('times_learned', 0)}
+    total = stats["total"]
+    correct = stats["correct"]
     incorrect = total - correct
-    times_practiced = item.get('times_learned', 0)
+    times_practiced = stats["times_learned"]
     accuracy_text = f"{round((correct / total) * 100)}%" if total > 0 else "N/A"
 
     # small pie figure (uses raw plotly figure dict so no extra imports needed)
@@ -107,8 +108,10 @@ def render_card(item, is_letter=True):
 def learning_options_page(enable_letters: bool, user_name:str, url:str = ""):
     buttons = []
 
-    user_data = read_user_json(username=user_name)
-    n = user_data.get("settings", {}).get("letters_per_session", 3)
+    with UserSession(user_name) as session:
+        n = session.settings.get("letters_per_session", 3)
+        learned_letters = session.progress_table("letter").card_stats(is_seen=True)
+        learned_words = session.progress_table("word").card_stats(is_seen=True)
 
     if "learn-thai" in url:
         if enable_letters:
@@ -118,12 +121,7 @@ def learning_options_page(enable_letters: bool, user_name:str, url:str = ""):
             buttons.append(dbc.Button("Practice Letters", color="secondary", className="m-1", href="/learn-thai/practice-letters"))
         buttons.append(dbc.Button("Practice Words", color="secondary", className="m-1", href="/learn-thai/practice-words"))
         buttons.append(dbc.Button("Sentences", color="info", className="m-1", href="/learn-thai/sentences"))
-    
-    user_data_letters = load_thai_json_as_list(username=user_name, is_letters=True)
-    user_data_words = load_thai_json_as_list(username=user_name, is_letters=False)
 
-    learned_letters = [i for i in user_data_letters if i.get('is_seen') == True]
-    learned_words = [i for i in user_data_words if i.get('is_seen') == True]
 
     layout = dbc.Container(
         [
@@ -154,8 +152,8 @@ def learning_options_page(enable_letters: bool, user_name:str, url:str = ""):
                     html.H2("Learned Letters", style={'textAlign': 'center', 'marginTop': '12px'}),
                     dbc.Row(
                         [
-                            dbc.Col(render_card(item, is_letter=True), xs=12, sm=6, md=4, lg=3)
-                            for item in learned_letters
+                            dbc.Col(render_card(stats["item"], is_letter=True, stats=stats), xs=12, sm=6, md=4, lg=3)
+                            for stats in learned_letters
                         ] or [dbc.Col(html.Div("No learned letters yet.", className="text-muted p-3"))],
                         className="g-3"
                     )
@@ -168,8 +166,8 @@ def learning_options_page(enable_letters: bool, user_name:str, url:str = ""):
                     html.H2("Learned Words", style={'textAlign': 'center', 'marginTop': '18px'}),
                     dbc.Row(
                         [
-                            dbc.Col(render_card(item, is_letter=False), xs=12, sm=6, md=4, lg=3)
-                            for item in learned_words
+                            dbc.Col(render_card(stats["item"], is_letter=False, stats=stats), xs=12, sm=6, md=4, lg=3)
+                            for stats in learned_words
                         ] or [dbc.Col(html.Div("No learned words yet.", className="text-muted p-3"))],
                         className="g-3"
                     )
@@ -189,4 +187,5 @@ def learning_options_page(enable_letters: bool, user_name:str, url:str = ""):
     State("user-name-store", "data")
 )
 def update_letters_count(value, user_name):
-    add_user_settings(username=user_name, settings={"letters_per_session": value})
\ No newline at end of file
+    with UserSession(user_name) as session:
+        session.set_settings({"letters_per_session": value})
\ No newline at end of file
@@ -1,14 +1,13 @@
 from dash import dcc, html, callback, Input, Output
 import dash_bootstrap_components as dbc
-from src.utils.user_utils import get_num_learned_letters, get_num_learned_words, read_user_json, words_can_learn
+from src.utils.user_utils import UserSession
 from src.modules.webbar import webbar_component
 from src.modules.navbar import navbar_component
 from src.pages.login import login_page
 from src.pages.account_create import account_create_page
 from src.pages.dashboard import dashboard_page
 from src.pages.learning_options import learning_options_page
-from src.pages.learning_page_letters import learning_page as learning_page_letters
-from src.pages.learning_page_words import learning_page as learning_page_words
+from src.pages.quiz_page import quiz_page
 
 
 def main_page():
@@ -32,7 +31,6 @@ def main_page():
 )
 def display_page(pathname, user_info):
     username = user_info.get("username") if user_info else "Guest"
-    user_data = read_user_json(username=username)
     
     if pathname == "/login":
         return login_page(), webbar_component()
@@ -45,10 +43,13 @@ def display_page(pathname, user_info):
     elif pathname == "/learn-thai":
         return learning_options_page(True, username, pathname), navbar_component()
     elif pathname == "/learn-thai/learn-letters":
-        return learning_page_letters(user_info=user_info, learned_language="thai", is_letters=True, is_practice=False), navbar_component()
+        return quiz_page(user_info=user_info, kind="letter", is_practice=False), navbar_component()
     elif pathname == "/learn-thai/practice-letters":
-        # print(f"Checking if enough letters learned to practice, {get_num_learned_letters(username=username)} learned VS {user_data.get('settings', {}).get('letters_per_session', 3)} required")
-        if get_num_learned_letters(username=username) < user_data.get("settings", {}).get("letters_per_session", 3):
+        with UserSession(username) as session:
+            num_learned_letters = session.count_items("letter")["seen"]
+            letters_per_session = session.settings.get("letters_per_session", 3)
+        # print(f"Checking if enough letters learned to practice, {num_learned_letters} learned VS {letters_per_session} required")
+        if num_learned_letters < letters_per_session:
             # print("Not enough letters learned to practice")
             return html.Div([
                 html.H2("You need to learn more letters before you can practice this many!", className="text-center my-4"),
@@ -58,19 +59,25 @@ def display_page(pathname, user_info):
             ]), navbar_component()
         else:
             # print("Enough letters learned, proceeding to practice")
-            return learning_page_letters(user_info=user_info, learned_language="thai", is_letters=True, is_practice=True), navbar_component()
+            return quiz_page(user_info=user_info, kind="letter", is_practice=True), navbar_component()
     elif pathname == "/learn-thai/learn-words":
-        if len(words_can_learn(username=username)) > user_data.get("settings", {}).get("letters_per_session", 3):
-            return learning_page_words(user_info=user_info, learned_language="thai", is_letters=False, is_practice=False), navbar_component()
+        with UserSession(username) as session:
+            num_learnable_words = session.count_learnable_words()
+            letters_per_session = session.settings.get("letters_per_session", 3)
+        if num_learnable_words > letters_per_session:
+            return quiz_page(user_info=user_info, kind="word", is_practice=False), navbar_component()
         else:
             return html.Div([
-                html.H2(f"You need to learn more letters before you can learn any words! You can only learn {len(words_can_learn(username=username))} words.", className="text-center my-4"),
+                html.H2(f"You need to learn more letters before you can learn any words! You can only learn {num_learnable_words} words.", className="text-center my-4"),
                 html.Div([
                     dbc.Button("Back to practice hub", href="/learn-thai", color="primary")
                 ], className="text-center")
             ]), navbar_component()
     elif pathname == "/learn-thai/practice-words":
-        if get_num_learned_words(username) < user_data.get("settings", {}).get("letters_per_session", 3):
+        with UserSession(username) as session:
+            num_learned_words = session.count_items("word")["seen"]
+            letters_per_session = session.settings.get("letters_per_session", 3)
+        if num_learned_words < letters_per_session:
             return html.Div([
                 html.H2("You need to learn more words before you can practice this many!", className="text-center my-4"),
                 html.Div([
@@ -78,6 +85,6 @@ def display_page(pathname, user_info):
                 ], className="text-center")
             ]), navbar_component()
         else:
-            return learning_page_words(user_info=user_info, learned_language="thai", is_letters=False, is_practice=True), navbar_component()
+            return quiz_page(user_info=user_info, kind="word", is_practice=True), navbar_component()
     else:
         return "404 - Page Not Found", navbar_component()
\ No newline at end of file
@@ -0,0 +1,166 @@
+from dash import html, dcc, callback, ctx, Input, Output, State
+from dash import ALL, MATCH, no_update
+from src.modules.question_modules.pick_one_of_four import create_pick_one_of_four
+from src.modules.question_modules.type_the_result import create_type_the_result
+from src.modules.question_modules.question_ids import (
+    CORRECT_COUNT, FINISH_BUTTON, NEXT_BUTTON, QUESTION_CONTAINER, QUESTION_HEADER, QUESTION_INDEX, QUIZ_ID,
+    START_BUTTON, TOTAL_QUESTIONS, question_id,
+)
+from src.utils.catalog import DEFAULT_LANGUAGE
+from src.utils.quiz_plan import end_quiz, get_quiz, review_quiz, start_quiz
+from src.utils.user_utils import UserSession
+
+# One page serves the quizzes of every item kind: its components carry the kind as their quiz
+# (see question_ids), so the callbacks below are registered once for all of them.
+
+
+def quiz_page(user_info, kind: str, num_questions: int = 20, is_practice: bool = False):
+    """
+    Learning (or, with is_practice, practice) quiz about items of the given kind ("letter" or
+    "word") for the logged in user; the items come from the catalog of the user's language.
+    """
+    with UserSession(user_info.get("username")) as session:
+        # the quiz (items, seed and every question) stays on the server, the page keeps its ID
+        quiz_id = start_quiz(session, num_questions, kind=kind, is_practice=is_practice)
+
+    next_button = html.Button(
+        "Next Question",
+        id=question_id(NEXT_BUTTON, kind),
+        n_clicks=0,
+        style={"marginTop": "12px", "width": "100%", "padding": "10px 12px", "display": "none"},
+        disabled=True
+    )
+    finish_button = html.Button(
+        "Finish Quiz",
+        id=question_id(FINISH_BUTTON, kind),
+        n_clicks=0,
+        style={"marginTop": "12px", "width": "100%", "padding": "10px 12px", "display": "none"},
+    )
+    start_button = html.Button(
+        "Start",
+        id=question_id(START_BUTTON, kind),
+        n_clicks=0,
+        style={"marginTop": "12px", "width": "100%", "padding": "10px 12px"}
+    )
+
+    return html.Div([
+        html.H2("", id=question_id(QUESTION_HEADER, kind), className="text-center my-4"),
+        html.Div(id=question_id(QUESTION_CONTAINER, kind), children=[]),
+        next_button,
+        finish_button,
+        start_button,
+        # Stores to keep track of state
+        dcc.Store(id=question_id(QUIZ_ID, kind), data=quiz_id),
+        dcc.Store(id=question_id(QUESTION_INDEX, kind), data=1),
+        dcc.Store(id=question_id(CORRECT_COUNT, kind), data=0),
+        dcc.Store(id=question_id(TOTAL_QUESTIONS, kind), data=num_questions),
+    ])
+
+
+@callback(
+    Output(question_id(QUESTION_CONTAINER, MATCH), "children", allow_duplicate=True),
+    Output(question_id(QUESTION_HEADER, MATCH), "children", allow_duplicate=True),
+    Output(question_id(QUESTION_INDEX, MATCH), "data", allow_duplicate=True),
+    Output(question_id(NEXT_BUTTON, MATCH), "style", allow_duplicate=True),
+    Output(question_id(FINISH_BUTTON, MATCH), "style", allow_duplicate=True),
+    Input(question_id(START_BUTTON, MATCH), "n_clicks"),
+    Input(question_id(QUESTION_HEADER, MATCH), "children"),
+    Input(question_id(NEXT_BUTTON, MATCH), "n_clicks"),
+    State(question_id(QUIZ_ID, MATCH), "data"),
+    State(question_id(QUESTION_INDEX, MATCH), "data"),
+    State(question_id(TOTAL_QUESTIONS, MATCH), "data"),
+    State(question_id(CORRECT_COUNT, MATCH), "data"),
+    prevent_initial_call=True
+)
+def load_question(_, header_text, next_clicks, quiz_id, current_question_index, total_questions, num_correct):
+    header_text = f"Question {current_question_index}/{total_questions}"
+    visible_style = {"marginTop": "12px", "width": "100%", "padding": "10px 12px", "display": "block"}
+    hidden_style = {"display": "none"}
+
+    quiz = get_quiz(quiz_id)
+    if quiz is None:
+        return html.Div("This quiz has expired, please start a new one."), "Expired", current_question_index, hidden_style, visible_style
+    quiz_plan = quiz["plan"]
+
+    if current_question_index > total_questions or current_question_index > len(quiz_plan or []):
+        return html.Div(f"Quiz Complete with {num_correct}/{total_questions} correct!"), "Finished!", current_question_index, hidden_style, visible_style
+    else:
+        # every question was generated when the page rendered, just show the next one
+        question = quiz_plan[current_question_index - 1]
+
+        if question["type"] == "pick_one_of_four":
+            return create_pick_one_of_four(
+                question=question["prompt"],
+                options=question["options"],
+                correct_id=question["correct"]+1,
+                instruction=question["instruction"],
+                small_buttons=question["small_buttons"],
+                kind=quiz["kind"],
+                item_key=question["key"]
+            ), header_text, current_question_index+1, visible_style, hidden_style
+
+        elif question["type"] == "type_the_result":
+            return create_type_the_result(
+                question=question["prompt"],
+                correct_answer=question["answer"],
+                instruction=question["instruction"],
+                kind=quiz["kind"],
+                item_key=question["key"],
+                language=quiz.get("language", DEFAULT_LANGUAGE)
+            ), header_text, current_question_index+1, visible_style, hidden_style
+
+
+# The url is not a quiz component, so this callback can't use MATCH: it gets the (single) quiz of
+# the page through ALL.
+@callback(
+    Output("url", "pathname", allow_duplicate=True),
+    Input(question_id(FINISH_BUTTON, ALL), "n_clicks"),
+    State(question_id(CORRECT_COUNT, ALL), "data"),
+    State(question_id(QUIZ_ID, ALL), "data"),
+    prevent_initial_call=True
+)
+def finish_quiz(finish_clicks, correct_counts, quiz_ids):
+    if not ctx.triggered_id or not any(finish_clicks):
+        return no_update
+    # components of one quiz come in the same order in every ALL list
+    index = [c["id"] for c in ctx.inputs_list[0]].index(ctx.triggered_id)
+    quiz_id = quiz_ids[index]
+    quiz = get_quiz(quiz_id)
+    if quiz is not None:
+        kind = quiz["kind"]
+        print("Num Questions Correct:", correct_counts[index])
+        # the quiz's user is the one it was started for on the server, whatever the browser sends;
+        # load the user's document once, apply every change, save once
+        with UserSession(quiz["username"]) as session:
+            # the quiz's answers are in the counters by now: review each item's schedule once
+            review_quiz(session, quiz)
+            # items answered (nearly) 100% correctly over their last 20 answers, in one pass
+            mastered = {id(item) for item in session.progress_table(kind).mastered_items()}
+            for key in set(quiz["question_keys"]):
+                item = session.find_item(kind, key)
+                if item is None:
+                    continue
+                if not quiz["is_practice"]:
+                    # items that are learned are marked as seen
+                    session.mark_seen(kind, key)
+                if id(item) in mastered:
+                    # items that are practiced and answered 100% correctly have their priority decreased
+                    session.bump_priority(kind, key)
+
+            # update user statistics
+            session.increment_sessions()
+        end_quiz(quiz_id)
+
+    return "/learn-thai"
+
+
+@callback(
+    Output(question_id(START_BUTTON, MATCH), "style"),
+    Output(question_id(NEXT_BUTTON, MATCH), "style", allow_duplicate=True),
+    Input(question_id(START_BUTTON, MATCH), "n_clicks"),
+    prevent_initial_call = True
+)
+def make_button_invisible(n_clicks):
+    invisible_style = {"marginTop": "12px", "width": "100%", "padding": "10px 12px", "display": "none"}
+    visible_style = {"marginTop": "12px", "width": "100%", "padding": "10px 12px"}
+    return invisible_style, visible_style
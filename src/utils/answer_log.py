@@ -0,0 +1,91 @@
+import json
+import os
+import threading
+import time
+from typing import List, Tuple
+from src.utils.file_utils import atomic_write
+
+# One line per answer: [seq, kind, item_key, result, timestamp]
+# e.g. [42,"letter","ก",1,1760000000]
+Entry = Tuple[int, str, str, bool, int]
+
+_lock = threading.Lock()
+
+
+def append_answers(path: str, answers: List[Tuple[int, str, str, bool]], ts: int = None) -> bool:
+    """
+    Append (seq, kind, key, result) answers to the log at path with a single write, stamped with
+    ts (default: now). This is the only write needed per answer, or per batch of queued answers.
+    Returns True if the lines were written, False otherwise.
+    """
+    if ts is None:
+        ts = int(time.time())
+    lines = "".join(json.dumps([seq, kind, key, 1 if result else 0, ts], ensure_ascii=False, separators=(",", ":")) + "\n"
+                    for seq, kind, key, result in answers)
+    try:
+        with _lock:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        return True
+    except OSError:
+        return False
+
+
+def read_entries(path: str, after_seq: int = 0) -> List[Entry]:
+    """
+    Return the log entries with a sequence number greater than after_seq, in log order.
+    A torn last line (e.g. after a crash mid-append) is ignored.
+    """
+    entries = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    seq, kind, key, result, ts = json.loads(line)
+                except (ValueError, TypeError):
+                    continue
+                if seq > after_seq:
+                    entries.append((seq, kind, key, bool(result), ts))
+    except OSError:
+        pass
+    return entries
+
+
+def log_size(path: str) -> int:
+    """Returns the size of the log in bytes, 0 if it does not exist."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def clear(path: str) -> None:
+    """Delete the log at path, if any."""
+    with _lock:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def truncate_through(path: str, seq: int) -> bool:
+    """
+    Compaction step: drop every entry with a sequence number <= seq, once those answers
+    have been folded into the snapshot document. Entries appended since are kept.
+    Returns True if the log was compacted (or did not exist), False otherwise.
+    """
+    with _lock:
+        if not os.path.isfile(path):
+            return True
+        remaining = read_entries(path, after_seq=seq)
+        if not remaining:
+            try:
+                os.remove(path)
+            except OSError:
+                return False
+            return True
+
+        def write(f):
+            for entry_seq, kind, key, result, ts in remaining:
+                f.write(json.dumps([entry_seq, kind, key, 1 if result else 0, ts], ensure_ascii=False, separators=(",", ":")) + "\n")
+        return atomic_write(path, write)
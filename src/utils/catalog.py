@@ -0,0 +1,346 @@
+import json
+import os
+import sys
+import threading
+from typing import Any, Dict, Optional, Tuple
+from src.utils.technical_utils import answer_variants, levenshtein_distance, normalize_answer
+from src.utils.item_schema import DEFAULT_LANGUAGE, ItemSchema, language_schemas, spelled_schema
+
+# Shared, read-only language catalogs (one per language) relative to this file: the catalog of
+# a language is LANGUAGE_FOLDER/<language>_data/<language>.json, holding one section per item
+# type of the language (see item_schema)
+LANGUAGE_FOLDER = os.path.join(os.path.dirname(__file__), '..', 'data', 'language_data')
+
+# Version marker of user documents stored as sparse progress over the catalog
+PROGRESS_FORMAT = 2
+
+# Number of ranked distractor candidates kept per item (see CompiledCatalog.distractor_pool)
+DISTRACTOR_POOL_SIZE = 12
+
+_catalogs: Dict[str, dict] = {}
+_catalogs_lock = threading.Lock()
+
+
+def catalog_path(language: str) -> str:
+    return os.path.join(LANGUAGE_FOLDER, f"{language}_data", f"{language}.json")
+
+
+def catalog_sections(language: str = DEFAULT_LANGUAGE) -> Dict[str, str]:
+    """Returns {section: field that is each item's stable ID} of the item types of language."""
+    return {schema.section: schema.key_field for schema in language_schemas(language).values()}
+
+
+def load_catalog(language: str = DEFAULT_LANGUAGE) -> dict:
+    """
+    Return the parsed catalog for language, loaded once per process.
+    The returned dict is shared: never mutate it.
+    Returns an empty dict if the language has no catalog or it cannot be read/parsed.
+    """
+    with _catalogs_lock:
+        catalog = _catalogs.get(language)
+        if catalog is not None:
+            return catalog
+        path = catalog_path(language)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                catalog = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            print(f"Error loading catalog for {language} from {path}")
+            catalog = {}
+        if not isinstance(catalog, dict):
+            catalog = {}
+        _catalogs[language] = catalog
+        return catalog
+
+
+def _catalog_index(catalog: dict, section: str, key_field: str) -> Dict[Any, dict]:
+    return {it[key_field]: it for it in catalog.get(section, []) if isinstance(it, dict) and key_field in it}
+
+
+def new_progress_document(language: str = DEFAULT_LANGUAGE) -> dict:
+    """
+    Returns the sparse document of a brand new user: no item progress yet,
+    default settings and statistics copied from the catalog.
+    """
+    catalog = load_catalog(language)
+    return {
+        "format": PROGRESS_FORMAT,
+        "language": language,
+        "progress": {section: {} for section in catalog_sections(language)},
+        "settings": dict(catalog.get("settings", {})),
+        "statistics": dict(catalog.get("statistics", {})),
+    }
+
+
+def is_progress_document(document: Any) -> bool:
+    return isinstance(document, dict) and document.get("format") == PROGRESS_FORMAT and isinstance(document.get("progress"), dict)
+
+
+def expand_progress(document: dict) -> dict:
+    """
+    Merge a sparse progress document with its shared catalog into a full user document
+    (the shape every caller works with: one list of complete items per section of the language,
+    e.g. "thai_letters" and "thai_words").
+    Each item is a fresh dict: the catalog's static fields overlaid with the user's changes.
+    Documents that are not sparse (legacy full copies) are returned unchanged.
+    """
+    if not is_progress_document(document):
+        return document
+    language = document.get("language", DEFAULT_LANGUAGE)
+    catalog = load_catalog(language)
+    progress = document["progress"]
+
+    full = {}
+    for section, key_field in catalog_sections(language).items():
+        changes = progress.get(section, {})
+        items = []
+        for base in catalog.get(section, []):
+            if not isinstance(base, dict):
+                continue
+            item = dict(base)
+            delta = changes.get(base.get(key_field))
+            if delta:
+                item.update(delta)
+            items.append(item)
+        # items that are not part of the catalog are stored whole
+        known = {it.get(key_field) for it in items}
+        items.extend(dict(delta) for key, delta in changes.items() if key not in known and isinstance(delta, dict) and delta.get(key_field) == key)
+        full[section] = items
+
+    for key, value in document.items():
+        if key not in ("format", "progress"):
+            full[key] = value
+    return full
+
+
+def compact_progress(document: dict) -> dict:
+    """
+    Reduce a full user document to its sparse progress form: for every item only the fields that
+    differ from the shared catalog are kept (items unknown to the catalog are kept whole).
+    """
+    if is_progress_document(document) or not isinstance(document, dict):
+        return document
+    language = document.get("language", DEFAULT_LANGUAGE)
+    catalog = load_catalog(language)
+
+    sections = catalog_sections(language)
+    progress = {}
+    for section, key_field in sections.items():
+        base_items = _catalog_index(catalog, section, key_field)
+        changes = {}
+        for item in document.get(section, []) or []:
+            if not isinstance(item, dict) or item.get(key_field) is None:
+                continue
+            key = item[key_field]
+            base = base_items.get(key)
+            if base is None:
+                changes[key] = item
+                continue
+            delta = {k: v for k, v in item.items() if k not in base or base[k] != v}
+            if delta:
+                changes[key] = delta
+        progress[section] = changes
+
+    sparse = {"format": PROGRESS_FORMAT, "language": language, "progress": progress}
+    for key, value in document.items():
+        if key not in sections and key not in sparse:
+            sparse[key] = value
+    return sparse
+
+
+class CatalogItem:
+    """
+    Compact, read-only catalog record of one item. id is its dense index in the catalog; each item
+    type gets a subclass with one slot per field of its schema (see record_type).
+    """
+    __slots__ = ("id",)
+    FIELDS: Tuple[str, ...] = ()
+
+    def __init__(self, id: int, data: dict):
+        self.id = id
+        for field in self.FIELDS:
+            value = data.get(field)
+            if isinstance(value, list):
+                value = tuple(_intern(part) for part in value)
+            setattr(self, field, _intern(value))
+
+    def get(self, field: str, default: Any = None) -> Any:
+        return getattr(self, field, default) if field in self.FIELDS else default
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+_record_types: Dict[Tuple[str, str], type] = {}
+
+
+def record_type(schema: ItemSchema) -> type:
+    """Returns the CatalogItem subclass holding the fields of schema's items."""
+    key = (schema.language, schema.kind)
+    if key not in _record_types:
+        fields = tuple(dict.fromkeys(schema.fields + schema.lookup_fields))
+        _record_types[key] = type(f"{schema.language.capitalize()}{schema.kind.capitalize()}Item", (CatalogItem,),
+                                  {"__slots__": fields, "FIELDS": fields})
+    return _record_types[key]
+
+
+class CompiledCatalog:
+    """
+    A language catalog compiled once per process: items are __slots__ records with dense integer
+    IDs (their position in the catalog, which is also their position in every merged user
+    document), and lookup dicts map each identifying field value to an item ID. The item types and
+    their fields are the language's schemas (see item_schema).
+    words_by_letter is the inverted index from a letter (its stable ID) to the IDs of the words
+    spelled with it, and word_letters[word_id] is the set of distinct letters of that word; the
+    words are the items of the language's schema with a spelling_field.
+    Every answer that can be asked in a typed question maps to its accepted answer set (see
+    accepted_answers).
+    """
+
+    def __init__(self, language: str, raw: dict):
+        self.language = language
+        self.schemas = language_schemas(language)
+        self.items: Dict[str, list] = {}
+        # kind -> field -> value -> id of the first item with that value
+        self.lookup: Dict[str, Dict[str, Dict[Any, int]]] = {}
+        for kind, schema in self.schemas.items():
+            record = record_type(schema)
+            records = [record(i, it) for i, it in enumerate(it for it in raw.get(schema.section, []) if isinstance(it, dict))]
+            self.items[kind] = records
+            self.lookup[kind] = {field: {} for field in schema.lookup_fields}
+            for record in records:
+                for field in schema.lookup_fields:
+                    value = getattr(record, field)
+                    if value is not None:
+                        self.lookup[kind][field].setdefault(value, record.id)
+
+        # the items spelled with letters (words): see ItemSchema.spelling_field
+        spelled = spelled_schema(language)
+        words = self.items[spelled.kind] if spelled is not None else []
+        self.word_letters = [frozenset(getattr(word, spelled.spelling_field) or ()) for word in words]
+        by_letter: Dict[str, list] = {}
+        for word_id, letters in enumerate(self.word_letters):
+            for letter in letters:
+                by_letter.setdefault(letter, []).append(word_id)
+        self.words_by_letter: Dict[str, tuple] = {letter: tuple(ids) for letter, ids in by_letter.items()}
+        # kind -> item ID -> IDs of its most similar items (see distractor_pool), built here once
+        self._distractors: Dict[str, list] = {kind: _build_distractor_pools(schema, self.items[kind])
+                                              for kind, schema in self.schemas.items()}
+
+        # normalized expected answer -> normalized answers accepted for it, for typed answer fields
+        self._accepted: Dict[str, frozenset] = {}
+        for kind, schema in self.schemas.items():
+            typed_fields = {answer_field for _, answer_field in schema.typed_pairs}
+            for record in self.items[kind]:
+                for field in typed_fields:
+                    value = getattr(record, field)
+                    if isinstance(value, str) and value:
+                        key = normalize_answer(value, language)
+                        if key not in self._accepted:
+                            self._accepted[key] = answer_variants(value, language)
+
+    def find(self, kind: str, value: Any) -> Optional[int]:
+        """
+        Returns the ID of the first item (in catalog order) one of whose lookup fields (e.g.
+        char/name/sound, or word/meaning/pronunciation) equals value, or None.
+        """
+        ids = [by_value[value] for by_value in self.lookup[kind].values() if value in by_value]
+        return min(ids) if ids else None
+
+    def find_by(self, kind: str, field: str, value: Any) -> Optional[int]:
+        """Returns the ID of the first item whose given field equals value, or None."""
+        return self.lookup[kind].get(field, {}).get(value)
+
+    def item(self, kind: str, item_id: int):
+        return self.items[kind][item_id]
+
+    def key_of(self, kind: str, item_id: int) -> Any:
+        """Returns the stable ID (letter char / word) of an item."""
+        return getattr(self.items[kind][item_id], self.schemas[kind].key_field)
+
+    def accepted_answers(self, truth: str) -> frozenset:
+        """
+        Returns the normalized typed answers accepted as exactly right for the expected answer
+        truth (see technical_utils.answer_variants), precomputed for the catalog's answers.
+        """
+        accepted = self._accepted.get(normalize_answer(truth, self.language))
+        if accepted is None:
+            accepted = answer_variants(truth, self.language)
+        return accepted
+
+    def distractor_pool(self, kind: str, item_id: int) -> Tuple[int, ...]:
+        """
+        Returns the IDs of the DISTRACTOR_POOL_SIZE items most easily confused with the given one,
+        most similar first. Candidates never share the item's char/name/sound (or word/meaning/
+        pronunciation), so any of them is a valid wrong answer. Pools are built with the catalog.
+        """
+        return self._distractors[kind][item_id]
+
+
+def _similar_text(a: Any, b: Any) -> float:
+    if not a or not b:
+        return 0.0
+    return 1.0 - levenshtein_distance(a, b) / max(len(a), len(b))
+
+
+def _value_set(value: Any) -> set:
+    # "/"-separated text (e.g. a letter's initial / final sound) or a list (e.g. a word's letters)
+    if isinstance(value, str):
+        return {part.strip() for part in value.split("/")} - {""}
+    return set(value or ())
+
+
+def _similarity_features(schema: ItemSchema, record) -> tuple:
+    # the values shared with other items, then the text that reads alike (ItemSchema.similarity_fields)
+    if schema.similarity_fields is None:
+        # item types without similarity fields: similar looking IDs
+        return set(), str(record.get(schema.key_field) or "").lower()
+    values_field, text_field = schema.similarity_fields
+    return _value_set(record.get(values_field)), str(record.get(text_field) or "").lower()
+
+
+def _similarity(schema: ItemSchema, a: tuple, b: tuple) -> float:
+    if schema.similarity_by_share:
+        union = len(a[0] | b[0])
+        shared = len(a[0] & b[0]) / union if union else 0.0
+    else:
+        shared = len(a[0] & b[0])
+    return 2.0 * shared + _similar_text(a[1], b[1])
+
+
+def _build_distractor_pools(schema: ItemSchema, records: list) -> list:
+    fields = schema.lookup_fields
+    values = [{getattr(record, field) for field in fields} - {None} for record in records]
+    features = [_similarity_features(schema, record) for record in records]
+    # the score is symmetric: compute each pair once
+    scores = [[0.0] * len(records) for _ in records]
+    for i in range(len(records)):
+        for j in range(i + 1, len(records)):
+            scores[i][j] = scores[j][i] = _similarity(schema, features[i], features[j])
+
+    pools = []
+    for i in range(len(records)):
+        candidates = [j for j in range(len(records)) if j != i and not values[i] & values[j]]
+        candidates.sort(key=lambda j: (-scores[i][j], j))
+        pools.append(tuple(candidates[:DISTRACTOR_POOL_SIZE]))
+    return pools
+
+
+_compiled: Dict[str, CompiledCatalog] = {}
+# language -> lock held while its catalog compiles, so compiling one language (distractor pools
+# included) never blocks lookups of the others
+_compile_locks: Dict[str, threading.Lock] = {}
+
+
+def get_compiled_catalog(language: str = DEFAULT_LANGUAGE) -> CompiledCatalog:
+    """Returns the compiled catalog for language, built once per process."""
+    compiled = _compiled.get(language)
+    if compiled is None:
+        with _catalogs_lock:
+            compile_lock = _compile_locks.setdefault(language, threading.Lock())
+        with compile_lock:
+            compiled = _compiled.get(language)
+            if compiled is None:
+                compiled = _compiled[language] = CompiledCatalog(language, load_catalog(language))
+    return compiled
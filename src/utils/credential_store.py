@@ -0,0 +1,157 @@
+import csv
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+from typing import Dict, Optional
+from src.utils.file_utils import atomic_write, file_lock
+
+# Salted password hashes are stored as "pbkdf2_sha256$<iterations>$<salt hex>$<hash hex>"
+HASH_ALGORITHM = "pbkdf2_sha256"
+HASH_ITERATIONS = 200_000
+SALT_BYTES = 16
+
+# Hash verified against when the username is unknown, so a failed login costs the same either way
+_DUMMY_HASH = None
+
+
+def hash_password(password: str, salt: Optional[bytes] = None, iterations: int = HASH_ITERATIONS) -> str:
+    """Returns the salted hash string to store for password."""
+    if salt is None:
+        salt = secrets.token_bytes(SALT_BYTES)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    return f"{HASH_ALGORITHM}${iterations}${salt.hex()}${digest.hex()}"
+
+
+def is_hashed(stored: str) -> bool:
+    return stored.startswith(HASH_ALGORITHM + "$")
+
+
+def verify_password(password: str, stored: str) -> bool:
+    """
+    Check password against a stored hash string, in constant time.
+    Rows written before hashing was introduced hold the plain password; they are still accepted
+    (compared in constant time too) so they can be upgraded on the next successful login.
+    """
+    if not is_hashed(stored):
+        return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+    try:
+        _, iterations, salt_hex, digest_hex = stored.split("$")
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), bytes.fromhex(salt_hex), int(iterations))
+    except ValueError:
+        return False
+    return hmac.compare_digest(digest.hex(), digest_hex)
+
+
+class CredentialIndex:
+    """
+    In-memory index of the credentials CSV, keyed by username.
+    The file is parsed once and re-parsed only when its mtime/size change (e.g. another worker
+    created an account), so lookups cost a stat() and a dict access instead of a file scan.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._users: Dict[str, str] = {}
+        self._token = None
+        self._lock = threading.RLock()
+
+    def _file_token(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _refresh(self) -> None:
+        token = self._file_token()
+        if token == self._token:
+            return
+        users = {}
+        if token is not None:
+            with open(self.path, mode='r', newline='', encoding='utf-8') as csvfile:
+                for row in csv.DictReader(csvfile):
+                    if row.get('username'):
+                        users[row['username']] = row.get('password') or ""
+        self._users = users
+        self._token = token
+
+    def exists(self, username: str) -> bool:
+        with self._lock:
+            self._refresh()
+            return username in self._users
+
+    def verify(self, username: str, password: str) -> bool:
+        """
+        Returns True if password matches the stored credential for username.
+        Legacy plain-text rows are rewritten as salted hashes after a successful check.
+        """
+        global _DUMMY_HASH
+        with self._lock:
+            self._refresh()
+            stored = self._users.get(username)
+        if stored is None:
+            if _DUMMY_HASH is None:
+                _DUMMY_HASH = hash_password(secrets.token_hex(8))
+            verify_password(password, _DUMMY_HASH)
+            return False
+        if not verify_password(password, stored):
+            return False
+        if not is_hashed(stored):
+            self._rewrite({username: hash_password(password)})
+        return True
+
+    def add(self, username: str, password: str) -> bool:
+        """
+        Append a new user with a salted hash of password.
+        Returns False if the username already exists.
+        """
+        hashed = hash_password(password)
+        # the file lock keeps another worker from adding the same username between check and append
+        with self._lock, file_lock(self.path + ".lock"):
+            self._refresh()
+            if username in self._users:
+                return False
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            file_exists = os.path.isfile(self.path)
+            with open(self.path, mode='a', newline='', encoding='utf-8') as csvfile:
+                writer = csv.writer(csvfile)
+                if not file_exists:
+                    writer.writerow(['username', 'password'])
+                writer.writerow([username, hashed])
+            self._users[username] = hashed
+            self._token = self._file_token()
+        return True
+
+    def _rewrite(self, updates: Dict[str, str]) -> None:
+        with self._lock, file_lock(self.path + ".lock"):
+            self._refresh()
+            users = dict(self._users)
+            users.update(updates)
+
+            def write(csvfile):
+                writer = csv.writer(csvfile)
+                writer.writerow(['username', 'password'])
+                for name, stored in users.items():
+                    writer.writerow([name, stored])
+
+            if not atomic_write(self.path, write, newline=''):
+                print(f"Error rewriting credentials file {self.path}")
+                return
+            self._users = users
+            self._token = self._file_token()
+
+
+_indexes: Dict[str, CredentialIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_credential_index(path: str) -> CredentialIndex:
+    """Returns the process-wide index for the credentials file at path."""
+    path = os.path.abspath(path)
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = _indexes[path] = CredentialIndex(path)
+        return index
@@ -0,0 +1,166 @@
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+import urllib.parse
+import zlib
+from datetime import datetime, timezone
+from typing import Optional
+from flask import Response, abort, request
+from src.utils import user_utils
+from src.utils.file_utils import atomic_write, file_lock
+
+# The user's data is downloaded from EXPORT_ROUTE/<username>.json?token=<token>. The Dash pages
+# are not backed by a Flask login, so the dashboard hands out links signed with EXPORT_SECRET
+# (HMAC of the username and an expiry time) instead.
+EXPORT_ROUTE = "/export"
+EXPORT_TOKEN_MAX_AGE = 60 * 60  # seconds a download link stays valid
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+# Every worker process must sign with the same secret: take it from the environment, or else
+# generate it once and keep it in EXPORT_SECRET_FILE.
+EXPORT_SECRET_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'user_data', 'export_secret.key')
+_secret = os.environ.get("EXPORT_SECRET", "").encode("utf-8") or None
+
+
+def _get_secret() -> bytes:
+    global _secret
+    if _secret is None:
+        with file_lock(EXPORT_SECRET_FILE + ".lock"):
+            try:
+                with open(EXPORT_SECRET_FILE, "r", encoding="utf-8") as f:
+                    _secret = bytes.fromhex(f.read().strip())
+            except (OSError, ValueError):
+                _secret = secrets.token_bytes(32)
+                atomic_write(EXPORT_SECRET_FILE, lambda f: f.write(_secret.hex()))
+    return _secret
+
+
+def _sign(username: str, expires: int) -> str:
+    message = f"{username}\n{expires}".encode("utf-8")
+    return hmac.new(_get_secret(), message, hashlib.sha256).hexdigest()
+
+
+def export_token(username: str, max_age: int = EXPORT_TOKEN_MAX_AGE) -> str:
+    """Returns a token allowing to download username's data for the next max_age seconds."""
+    expires = int(time.time()) + max_age
+    return f"{expires}.{_sign(username, expires)}"
+
+
+def check_export_token(username: str, token: str) -> bool:
+    """True if token was issued for username by export_token and has not expired yet."""
+    try:
+        expires, signature = (token or "").split(".", 1)
+        expires = int(expires)
+    except ValueError:
+        return False
+    if expires < time.time():
+        return False
+    return hmac.compare_digest(signature, _sign(username, expires))
+
+
+def export_url(username: str) -> str:
+    """Returns the signed download link of username's data."""
+    return f"{EXPORT_ROUTE}/{urllib.parse.quote(username, safe='')}.json?token={export_token(username)}"
+
+
+def _document_version(username: str):
+    """
+    Returns (etag, last modified time) of username's stored document, taken from the fingerprint
+    of the user's files with the json backend, so a conditional request is answered without
+    serializing anything. Answers appended to the answer log since the last snapshot count as a
+    modification. Returns (None, None) with the sqlite backend (see _body_etag).
+    """
+    if user_utils.STORAGE_BACKEND == "sqlite":
+        return None, None
+    token = user_utils._user_file_token(username)
+    if token is None:
+        return None, None
+    last_modified = token[0] / 1e9
+    try:
+        last_modified = max(last_modified, os.path.getmtime(user_utils._user_logpath(username)))
+    except OSError:
+        pass  # no answers logged since the snapshot
+    return hashlib.sha1(repr(token).encode("utf-8")).hexdigest(), last_modified
+
+
+def _encoded_chunks(document: dict):
+    """Yields the JSON encoding of document in chunks of about EXPORT_CHUNK_BYTES, as it is encoded."""
+    encoder = json.JSONEncoder(ensure_ascii=False, indent=2)
+    buffer, size = [], 0
+    for piece in encoder.iterencode(document):
+        data = piece.encode("utf-8")
+        buffer.append(data)
+        size += len(data)
+        if size >= EXPORT_CHUNK_BYTES:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def _body_etag(document: dict) -> str:
+    # hashed over the encoding as it streams, the body is never held in memory
+    digest = hashlib.sha1()
+    for chunk in _encoded_chunks(document):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _not_modified(etag: str, last_modified: Optional[float]) -> bool:
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return int(last_modified) <= request.if_modified_since.timestamp()
+    return False
+
+
+def _gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _export_user(username: str):
+    if not check_export_token(username, request.args.get("token")):
+        abort(403)
+    if not user_utils.is_known_user(username):
+        abort(404)
+
+    # queued answers and cached changes go to disk first, so the files describe what is exported;
+    # the lock is only held to take the version and a private copy of the document, which is
+    # then encoded while it streams out
+    with user_utils.user_lock(username):
+        user_utils.flush_user_json(username)
+        etag, last_modified = _document_version(username)
+        if etag is None or not _not_modified(etag, last_modified):
+            document = user_utils.read_user_snapshot(username)
+    if etag is None:
+        etag = _body_etag(document)
+
+    headers = {
+        # weak: the gzipped and the plain responses carry the same tag
+        "ETag": f'W/"{etag}"',
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = datetime.fromtimestamp(int(last_modified), timezone.utc).strftime("%a, %d %b %Y %H:%M:%S GMT")
+    if _not_modified(etag, last_modified):
+        return Response(status=304, headers=headers)
+
+    headers["Content-Disposition"] = f"attachment; filename*=UTF-8''{urllib.parse.quote(username, safe='')}.json"
+    if request.accept_encodings["gzip"]:
+        headers["Content-Encoding"] = "gzip"
+        return Response(_gzip_chunks(_encoded_chunks(document)), mimetype="application/json", headers=headers)
+    return Response(_encoded_chunks(document), mimetype="application/json", headers=headers)
+
+
+def register_export_routes(server) -> None:
+    """Adds the user data download route to the Flask server of the Dash app."""
+    server.add_url_rule(f"{EXPORT_ROUTE}/<username>.json", "export_user", _export_user)
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, IO, Optional
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows: fall back to in-process locking only
+    fcntl = None
+
+
+def atomic_write(path: str, write: Callable[[IO], None], mode: str = "w", encoding: str = "utf-8", newline: Optional[str] = None) -> bool:
+    """
+    Write a file atomically: write(f) fills a temporary file in the same folder, which is flushed,
+    fsynced and then renamed over path. Readers see either the old or the new file, never a
+    partially written one.
+    Returns True if the file was written, False on OSError (the original file is left untouched).
+    """
+    folder = os.path.dirname(path) or "."
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=folder)
+    try:
+        kwargs = {} if "b" in mode else {"encoding": encoding, "newline": newline}
+        with os.fdopen(fd, mode, **kwargs) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return True
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return False
+
+
+class _PathLock:
+    def __init__(self):
+        self.thread_lock = threading.RLock()
+        self.depth = 0
+        self.fd = None
+
+
+_path_locks: Dict[str, _PathLock] = {}
+_path_locks_guard = threading.Lock()
+
+
+@contextmanager
+def file_lock(path: str):
+    """
+    Hold an exclusive advisory lock on path (created if needed) for the duration of the block.
+    The lock is taken with fcntl.flock so it excludes other processes (e.g. gunicorn workers),
+    and with a per-path RLock so it also excludes other threads. It is re-entrant within a thread.
+    """
+    path = os.path.abspath(path)
+    with _path_locks_guard:
+        lock = _path_locks.get(path)
+        if lock is None:
+            lock = _path_locks[path] = _PathLock()
+
+    with lock.thread_lock:
+        if lock.depth == 0 and fcntl is not None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            lock.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(lock.fd, fcntl.LOCK_EX)
+        lock.depth += 1
+        try:
+            yield
+        finally:
+            lock.depth -= 1
+            if lock.depth == 0 and lock.fd is not None:
+                fcntl.flock(lock.fd, fcntl.LOCK_UN)
+                os.close(lock.fd)
+                lock.fd = None
@@ -0,0 +1,136 @@
+from typing import Dict, Optional, Tuple
+from src.utils.technical_utils import DEFAULT_LANGUAGE
+
+
+class ItemSchema:
+    """
+    Declaration of one item type of one language (e.g. Thai letters): its fields, where its items
+    live in the language's catalog / a user document, the fields identifying an item, and how
+    questions about it are built.
+    The selection and question code in learning_utils, the catalog, the user indexes and the
+    sqlite tables all read these declarations, so a new language or item type only needs schemas
+    (and a catalog) instead of its own copy of that code.
+    - language, kind: the schema is registered under (language, kind); kind (e.g. "letter") names
+      the quiz and the user's progress of the items
+    - section: catalog / user document list holding the items
+    - fields: the static fields of an item, as given by the catalog
+    - lookup_fields: fields an item can be found by; the first one is its stable ID
+    - priority_key: field ordering the items to learn, lowest first
+    - unique_keys: fields no two items of one session (or one question) may share
+    - choice_pairs: allowed (question field, answer field) pairs of pick-one-of-four questions
+    - typed_pairs: allowed (question field, answer field) pairs of type-the-result questions
+    - small_button_fields: answer fields whose pick-one-of-four options use small buttons
+    - spelling_field, spelling_kind: field listing the items of kind spelling_kind (the stable
+      IDs of letters) an item is spelled with (words), which the catalog indexes to find the
+      words a user can learn
+    - similarity_fields: (values field, text field) of the items most easily confused with each
+      other: those sharing values of the first ("/"-separated text, or a list), then those whose
+      second field reads alike. similarity_by_share scores shared values as a share of all
+      values rather than as a count.
+    """
+
+    def __init__(self, language: str, kind: str, section: str, fields: Tuple[str, ...],
+                 lookup_fields: Tuple[str, ...], priority_key: str,
+                 unique_keys: Tuple[str, ...], choice_pairs: Tuple[Tuple[str, str], ...],
+                 typed_pairs: Tuple[Tuple[str, str], ...] = (), small_button_fields: Tuple[str, ...] = (),
+                 spelling_field: Optional[str] = None, spelling_kind: Optional[str] = None,
+                 similarity_fields: Optional[Tuple[str, str]] = None, similarity_by_share: bool = True):
+        self.language = language
+        self.kind = kind
+        self.section = section
+        self.fields = fields
+        self.lookup_fields = lookup_fields
+        self.key_field = lookup_fields[0]
+        self.priority_key = priority_key
+        self.unique_keys = unique_keys
+        self.choice_pairs = choice_pairs
+        self.typed_pairs = typed_pairs
+        self.small_button_fields = small_button_fields
+        self.spelling_field = spelling_field
+        self.spelling_kind = spelling_kind
+        self.similarity_fields = similarity_fields
+        self.similarity_by_share = similarity_by_share
+        # question types a session mixes (typed questions only once the items are well known)
+        self.question_types = ("pick_one_of_four", "type_the_result") if typed_pairs else ("pick_one_of_four",)
+
+
+# (language, kind) -> schema, in registration order
+SCHEMAS: Dict[Tuple[str, str], ItemSchema] = {}
+
+
+def register_schema(schema: ItemSchema) -> ItemSchema:
+    """Make an item type of a language known to the catalog and the learning code. Returns schema."""
+    SCHEMAS[(schema.language, schema.kind)] = schema
+    return schema
+
+
+def get_schema(kind: str, language: str = DEFAULT_LANGUAGE) -> ItemSchema:
+    """Returns the schema of the given kind of language; raises KeyError for unknown kinds."""
+    return SCHEMAS[(language, kind)]
+
+
+def language_schemas(language: str = DEFAULT_LANGUAGE) -> Dict[str, ItemSchema]:
+    """Returns {kind: schema} of every item type of language (empty for unknown languages)."""
+    return {kind: schema for (schema_language, kind), schema in SCHEMAS.items() if schema_language == language}
+
+
+def spelled_schema(language: str = DEFAULT_LANGUAGE) -> Optional[ItemSchema]:
+    """Returns the schema of language's items spelled with other items (words), or None."""
+    return next((schema for schema in language_schemas(language).values() if schema.spelling_field), None)
+
+
+def schema_for_priority_key(priority_key: str, language: str = DEFAULT_LANGUAGE) -> Optional[ItemSchema]:
+    """Returns the schema of language ordered by priority_key, or None."""
+    for schema in language_schemas(language).values():
+        if schema.priority_key == priority_key:
+            return schema
+    return None
+
+
+register_schema(ItemSchema(
+    language="thai",
+    kind="letter",
+    section="thai_letters",
+    fields=("letter_char", "letter_name", "letter_sound", "letter_priority"),
+    lookup_fields=("letter_char", "letter_name", "letter_sound"),
+    priority_key="letter_priority",
+    unique_keys=("letter_name", "letter_sound"),
+    # a letter's name and sound are never asked for each other
+    choice_pairs=(
+        ("letter_name", "letter_char"),
+        ("letter_char", "letter_name"),
+        ("letter_sound", "letter_char"),
+        ("letter_char", "letter_sound"),
+    ),
+    typed_pairs=(
+        ("letter_char", "letter_name"),
+        ("letter_char", "letter_sound"),
+    ),
+    small_button_fields=("letter_name",),
+    # letters sharing an initial or final sound are the hardest to tell apart
+    similarity_fields=("letter_sound", "letter_name"),
+    similarity_by_share=False,
+))
+
+register_schema(ItemSchema(
+    language="thai",
+    kind="word",
+    section="thai_words",
+    fields=("word", "meaning", "pronunciation", "spelling", "priority"),
+    lookup_fields=("word", "meaning", "pronunciation"),
+    priority_key="priority",
+    unique_keys=("meaning", "pronunciation"),
+    choice_pairs=(
+        ("word", "meaning"),
+        ("meaning", "word"),
+        ("word", "pronunciation"),
+        ("pronunciation", "word"),
+        ("meaning", "pronunciation"),
+        ("pronunciation", "meaning"),
+    ),
+    small_button_fields=("word", "meaning", "pronunciation"),
+    spelling_field="spelling",
+    spelling_kind="letter",
+    # words written with the same letters, then words that sound alike
+    similarity_fields=("spelling", "pronunciation"),
+))
@@ -1,7 +1,17 @@
 import random
 from typing import List, Dict, Any
 import json
-from src.utils.technical_utils import string_similarity
+from src.utils.technical_utils import normalize_answer, normalized_similarity
+from src.utils.scheduler import ItemScheduler
+from src.utils.catalog import DEFAULT_LANGUAGE, get_compiled_catalog
+from src.utils.item_schema import get_schema, schema_for_priority_key
+from src.utils.user_utils import read_user_json
+
+# Every function drawing random choices takes an rng: a session's seeded random.Random (see
+# quiz_plan.plan_session) so its questions can be replayed, or the random module by default.
+
+# Typed answers at least this similar to the expected answer are accepted
+TEXT_ANSWER_MIN_SIMILARITY = 0.8
 
 
 def load_thai_json_as_list(username:str = "", path: str = "src/data/language_data/thai_data/thai.json", is_letters: bool = True) -> List[Dict[str, Any]]:
@@ -13,19 +23,18 @@ def load_thai_json_as_list(username:str = "", path: str = "src/data/language_dat
     - On error or unexpected structure, returns an empty list.
     """
     if username != "":
-        path = f"src/data/user_data/user_data/{username}.json"
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            print(f"Loading JSON data from {path}")
-            data = json.load(f)
-    except Exception:
-        print(f"Error loading JSON data from {path}")
-        return []
-    
-    if is_letters:
-        data = data.get("thai_letters", [])
+        # user documents are served from the user cache rather than re-parsed from disk
+        data = read_user_json(username)
     else:
-        data = data.get("thai_words", [])
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                print(f"Loading JSON data from {path}")
+                data = json.load(f)
+        except Exception:
+            print(f"Error loading JSON data from {path}")
+            return []
+    
+    data = data.get(get_schema("letter" if is_letters else "word", "thai").section, [])
 
     final_data = []
     if isinstance(data, list):
@@ -41,314 +50,242 @@ def load_thai_json_as_list(username:str = "", path: str = "src/data/language_dat
     return final_data
 
 
-def pick_lowest_priority_items(items: List[Dict[str, Any]], n: int, priority_key: str = "letter_priority", is_seen: bool = False) -> List[Dict[str, Any]]:
+def pick_lowest_priority_items(items: List[Dict[str, Any]], n: int, priority_key: str = "letter_priority", is_seen: bool = False,
+                               rng: random.Random = random) -> List[Dict[str, Any]]:
     """
-    Sorts items by priority_key, selects items that have the lowest priority value,
-    and returns up to n unique items chosen randomly from that lowest-priority pool.
+    Selects items that have the lowest priority_key values (widening the pool level by level
+    until it holds 2n items) and returns up to n unique items chosen randomly from that pool.
     Sampling is always without replacement (i.e. no duplicates in the result).
     Items missing priority_key are ignored.
+    This builds a throwaway ItemScheduler; callers picking repeatedly for the same user should use
+    UserSession.pick_items, which keeps the scheduler between sessions.
     """
-    if n <= 0:
-        return []
-    
-    print(priority_key)
-    for item in items:
-        print(item.get("word"), priority_key in item.keys())
-
-    valid = [it for it in items if priority_key in it]
-    if is_seen:
-        valid = [it for it in valid if it.get("is_seen") == True]
-    else:
-        valid = [it for it in valid if it.get("is_seen") == False]
+    schema = schema_for_priority_key(priority_key) or get_schema("word")
+    return ItemScheduler(items, priority_key, schema.unique_keys).pick(n, is_seen=is_seen, rng=rng)
 
-    print(valid, "\n\n")
 
-    max = min(n * 2, len(valid))
-    
-    if not valid:
-        return []
+def _catalog_id(catalog, kind: str, item: Dict[str, Any]):
+    key_field = get_schema(kind, catalog.language).key_field
+    return catalog.find_by(kind, key_field, item.get(key_field))
 
-    # attempt numeric comparison first, fall back to direct comparison
-    pool = []
-    i = 0
-    while len(pool) < max:
-        try:
-            min_val = min(float(it[priority_key]) for it in valid) + i
-            pool = [it for it in valid if float(it[priority_key]) <= min_val]
-        except Exception:
-            min_val = min(it[priority_key] for it in valid) + i
-            pool = [it for it in valid if it[priority_key] <= min_val]
-        i += 1
 
-    if not pool:
+def sample_distractors(kind: str, truth: Dict[str, Any], k: int, rng: random.Random = random,
+                       language: str = DEFAULT_LANGUAGE) -> List[Any]:
+    """
+    Returns k wrong answers for truth, sampled from its precomputed pool of the most similar
+    catalog items (see CompiledCatalog.distractor_pool), as read-only catalog records sharing no
+    lookup field value (e.g. char/name/sound) with each other.
+    Returns an empty list if truth is not in the language's catalog or its pool is too small: only
+    then do callers fall back to their own candidates (see pick_one_of_four_question_data).
+    """
+    catalog = get_compiled_catalog(language)
+    item_id = _catalog_id(catalog, kind, truth)
+    if item_id is None:
         return []
-
-    k = n
-    if priority_key == "letter_priority":
-        keys = ["letter_name", "letter_sound"]
-    else:
-        keys = ["meaning", "pronunciation"]
-
-    # select up to k items ensuring unique letter_name and letter_sound
-    random.shuffle(pool)
-    selected: List[Dict[str, Any]] = []
-    seen_names = set()
-    seen_sounds = set()
-    for it in pool:
-        if not isinstance(it, dict):
-            continue
-        name = it.get(keys[0])
-        sound = it.get(keys[1])
-        # skip if would duplicate a seen name or sound (only consider non-None values)
-        if name is not None and name in seen_names:
-            continue
-        if sound is not None and sound in seen_sounds:
-            continue
-        selected.append(it)
-        if name is not None:
-            seen_names.add(name)
-        if sound is not None:
-            seen_sounds.add(sound)
-        if len(selected) >= k:
-            break
-
-    # print(f"Picked {len(selected)} items with lowest priority ({min_val}).\nItems: {selected}")
-    return selected
+    fields = get_schema(kind, language).lookup_fields
+    others = []
+    used = set()
+    # pool members never clash with truth; also keep them from clashing with each other
+    pool = catalog.distractor_pool(kind, item_id)
+    for other in rng.sample(pool, len(pool)):
+        record = catalog.item(kind, other)
+        values = {getattr(record, field) for field in fields} - {None}
+        if used.isdisjoint(values):
+            others.append(record)
+            used.update(values)
+            if len(others) == k:
+                return others
+    return []
+
+
+def _select_from_distractor_pools(kind: str, selected: List[Dict[str, Any]], n: int,
+                                  data: List[Dict[str, Any]], rng: random.Random = random,
+                                  language: str = DEFAULT_LANGUAGE) -> List[Dict[str, Any]]:
+    # union of the selected items' pools, minus anything clashing with a selected item
+    catalog = get_compiled_catalog(language)
+    fields = get_schema(kind, language).lookup_fields
+    selected_values = set()
+    selected_ids = set()
+    for it in selected:
+        if isinstance(it, dict):
+            selected_values.update(it.get(field) for field in fields)
+            selected_ids.add(_catalog_id(catalog, kind, it))
+    selected_values.discard(None)
+
+    candidates = {}
+    for item_id in selected_ids - {None}:
+        for other in catalog.distractor_pool(kind, item_id):
+            if other in candidates or other in selected_ids:
+                continue
+            if selected_values.isdisjoint(getattr(catalog.item(kind, other), field) for field in fields):
+                candidates[other] = None
+    # catalog IDs are positions in the user's (merged) item list
+    pool = [data[other] for other in candidates
+            if other < len(data) and isinstance(data[other], dict) and data[other].get(fields[0]) == catalog.key_of(kind, other)]
+    if n > len(pool):
+        return []
+    return rng.sample(pool, n)
 
 
-def select_random_letters_excluding(selected: List[Dict[str, Any]], n: int,
-                                    data: List[Dict[str, Any]]
-                                    ) -> List[Dict[str, Any]]:
+def select_random_items_excluding(kind: str, selected: List[Dict[str, Any]], n: int,
+                                  data: List[Dict[str, Any]],
+                                  rng: random.Random = random,
+                                  language: str = DEFAULT_LANGUAGE
+                                  ) -> List[Dict[str, Any]]:
     """
-    Return n random items from data[list_key] not present in `selected`.
-    Comparison prefers 'letter_char' then 'letter_name'. If n <= len(pool)
+    Return n random items of the given kind from data that share no lookup field value
+    (e.g. letter char, name or sound) with any item of `selected`. If n <= len(pool)
     sampling is without replacement; otherwise sampling is with replacement.
+    Items are drawn from the selected items' distractor pools (the items most easily
+    confused with them, in the catalog of data's language) when those hold enough candidates,
+    otherwise from the whole of data.
     """
     if n <= 0:
         return []
     if not isinstance(data, list):
         return []
 
-    sel_chars = set()
-    sel_names = set()
-    sel_sounds = set()
-    for it in selected:
-        if not isinstance(it, dict):
-            continue
-        if "letter_char" in it and it["letter_char"] is not None:
-            sel_chars.add(it["letter_char"])
-        if "letter_name" in it and it["letter_name"] is not None:
-            sel_names.add(it["letter_name"])
-        if "letter_sound" in it and it["letter_sound"] is not None:
-            sel_sounds.add(it["letter_sound"])
+    final_list = _select_from_distractor_pools(kind, selected, n, data, rng, language)
+    if final_list:
+        return final_list
 
-    pool = [lt for lt in data
-            if lt.get("letter_char") not in sel_chars and lt.get("letter_name") not in sel_names and lt.get("letter_sound") not in sel_sounds]
+    fields = get_schema(kind, language).lookup_fields
+    excluded = set()
+    for it in selected:
+        if isinstance(it, dict):
+            excluded.update((field, it.get(field)) for field in fields if it.get(field) is not None)
 
-    # print(f"Confusion pool size (excluding selected): {len(pool)}")
-    final_list = []
+    pool = [it for it in data
+            if isinstance(it, dict) and not any((field, it.get(field)) in excluded for field in fields)]
 
     if not pool:
-        return final_list
-
+        return []
     if n <= len(pool):
-        final_list = random.sample(pool, n)
-    else:
-        final_list = [random.choice(pool) for _ in range(n)]
+        return rng.sample(pool, n)
+    return [rng.choice(pool) for _ in range(n)]
 
-    # print(f"Selected {len(final_list)} confusion items excluding selected ones.")
 
-    return final_list
+def select_random_letters_excluding(selected: List[Dict[str, Any]], n: int,
+                                    data: List[Dict[str, Any]],
+                                    rng: random.Random = random
+                                    ) -> List[Dict[str, Any]]:
+    """select_random_items_excluding for letters."""
+    return select_random_items_excluding("letter", selected, n, data, rng)
 
 
 def select_random_words_excluding(selected: List[Dict[str, Any]], n: int,
-                                    data: List[Dict[str, Any]]
+                                    data: List[Dict[str, Any]],
+                                    rng: random.Random = random
                                     ) -> List[Dict[str, Any]]:
-    if n <= 0:
-        return []
-    if not isinstance(data, list):
-        return []
-
-    sel_words = set()
-    sel_pronunciation = set()
-    sel_meaning = set()
-    for it in selected:
-        if not isinstance(it, dict):
-            continue
-        if "word" in it and it["word"] is not None:
-            sel_words.add(it["word"])
-        if "pronunciation" in it and it["pronunciation"] is not None:
-            sel_pronunciation.add(it["pronunciation"])
-        if "meaning" in it and it["meaning"] is not None:
-            sel_meaning.add(it["meaning"])
-
-    pool = [lt for lt in data
-            if lt.get("word") not in sel_words and lt.get("pronunciation") not in sel_pronunciation and lt.get("meaning") not in sel_meaning]
-
-    # print(f"Confusion pool size (excluding selected): {len(pool)}")
-    final_list = []
-
-    if not pool:
-        return final_list
-
-    if n <= len(pool):
-        final_list = random.sample(pool, n)
-    else:
-        final_list = [random.choice(pool) for _ in range(n)]
+    """select_random_items_excluding for words."""
+    return select_random_items_excluding("word", selected, n, data, rng)
 
-    # print(f"Selected {len(final_list)} confusion items excluding selected ones.")
 
-    return final_list
+def random_question_type(kind: str, rng: random.Random = random, language: str = DEFAULT_LANGUAGE) -> str:
+    """Returns one of the question types the kind's schema allows, at random."""
+    return rng.choice(get_schema(kind, language).question_types)
 
 
-def random_question_from_pool(is_letters:bool=True) -> str:
-    letter_question_pool = ["pick_one_of_four", "type_the_result"]
-    word_question_pool = ["pick_one_of_four"]
-    if is_letters:
-        return random.choice(letter_question_pool)
-    else:
-        return random.choice(word_question_pool)
+def random_question_from_pool(is_letters:bool=True, rng: random.Random = random) -> str:
+    return random_question_type("letter" if is_letters else "word", rng)
 
 
-def get_pick_one_of_four_question_data(list1: List[Dict[str, Any]],
-                        list2: List[Dict[str, Any]],
-                        num_choices: int) -> tuple:
+def pick_one_of_four_question_data(kind: str,
+                                   list1: List[Dict[str, Any]],
+                                   list2: List[Dict[str, Any]],
+                                   num_choices: int,
+                                   truth: Dict[str, Any] = None,
+                                   rng: random.Random = random,
+                                   language: str = DEFAULT_LANGUAGE) -> tuple:
     """
-    Return (question_value, answers_list, correct_index).
-    - truth: one random dict from list1
-    - other options: num_choices-1 items sampled from list1+list2 excluding truth
-    - pick two distinct keys from truth that conform to allowed patterns:
-        ("letter_name","letter_char"), ("letter_char","letter_name"),
-        ("letter_sound","letter_char"), ("letter_char","letter_sound")
-      (i.e. "letter_name" + "letter_sound" is not allowed)
+    Return (question_value, answers_list, correct_index, instruction, small_buttons) for an item
+    of the given kind of the given language.
+    - truth: one random dict from list1 (unless given)
+    - other options: num_choices-1 items from truth's distractor pool whenever truth is in the
+      language's catalog; list1+list2 (e.g. the session's confusion items) are only sampled,
+      excluding truth, for items the catalog does not know or whose pool is too small
+    - the asked and answered fields are one of the schema's choice_pairs present in truth
     - answers_list is shuffled; correct_index is the index of the truth answer (0-based)
     """
     if num_choices < 2:
         raise ValueError("num_choices must be >= 2")
 
-    valid1 = [it for it in list1 if isinstance(it, dict)]
-    if not valid1:
-        raise ValueError("first list must contain at least one dict")
-
-    truth = random.choice(valid1)
-
-    pool = [it for it in (list1 + list2) if isinstance(it, dict) and it is not truth]
-    # print("Learning item sized pool:", len(list1))
-    # print("Confusion item sized pool:", len(list2))
-    # print("Pool size for incorrect answers:", len(pool))
+    if truth is None:
+        valid1 = [it for it in list1 if isinstance(it, dict)]
+        if not valid1:
+            raise ValueError("first list must contain at least one dict")
+        truth = rng.choice(valid1)
+    schema = get_schema(kind, language)
     needed = num_choices - 1
-    if needed > 0 and not pool:
-        raise ValueError("not enough items to build choices")
 
-    if needed <= len(pool):
-        others = random.sample(pool, needed)
-    else:
-        others = [random.choice(pool) for _ in range(needed)]
+    # the truth's precomputed pool of similar items, else the session's items
+    others = sample_distractors(kind, truth, needed, rng, language)
+    if not others:
+        pool = [it for it in (list1 + list2) if isinstance(it, dict) and it is not truth]
+        if needed > 0 and not pool:
+            raise ValueError("not enough items to build choices")
 
-    # allowed ordered key pairs
-    allowed_pairs = [
-        ("letter_name", "letter_char"),
-        ("letter_char", "letter_name"),
-        ("letter_sound", "letter_char"),
-        ("letter_char", "letter_sound"),
-    ]
-    possible_pairs = [pair for pair in allowed_pairs if pair[0] in truth and pair[1] in truth]
+        if needed <= len(pool):
+            others = rng.sample(pool, needed)
+        else:
+            others = [rng.choice(pool) for _ in range(needed)]
 
+    possible_pairs = [pair for pair in schema.choice_pairs if pair[0] in truth and pair[1] in truth]
     if not possible_pairs:
-        raise ValueError("truth item must contain a valid key pair (name/char or sound/char)")
+        raise ValueError(f"truth item must contain a valid key pair for {kind} questions")
 
-    question_key, answer_key = random.choice(possible_pairs)
+    question_key, answer_key = rng.choice(possible_pairs)
     question_value = truth.get(question_key)
 
     instruction = question_key.replace("_", " ").capitalize() + " => " + " Select the correct " + answer_key.replace("_", " ") + "."
-    small_buttons = False
-    if answer_key in ["letter_name"]:
-        small_buttons = True
+    small_buttons = answer_key in schema.small_button_fields
 
     answers = [truth.get(answer_key)] + [it.get(answer_key) for it in others]
-    random.shuffle(answers)
+    rng.shuffle(answers)
     correct_index = answers.index(truth.get(answer_key))
 
-    # print("Correct answer:", truth)
-    # print("Incorrect answers:", others)
-
     return question_value, answers, correct_index, instruction, small_buttons
 
 
-def pick_one_of_four_question_data_words(list1: List[Dict[str, Any]],
+def get_pick_one_of_four_question_data(list1: List[Dict[str, Any]],
                         list2: List[Dict[str, Any]],
-                        num_choices: int) -> tuple:
-    if num_choices < 2:
-        raise ValueError("num_choices must be >= 2")
+                        num_choices: int,
+                        truth: Dict[str, Any] = None,
+                        rng: random.Random = random) -> tuple:
+    """pick_one_of_four_question_data for letters."""
+    return pick_one_of_four_question_data("letter", list1, list2, num_choices, truth, rng)
 
-    valid1 = [it for it in list1 if isinstance(it, dict)]
-    if not valid1:
-        raise ValueError("first list must contain at least one dict")
 
-    truth = random.choice(valid1)
-
-    pool = [it for it in (list1 + list2) if isinstance(it, dict) and it is not truth]
-    # print("Learning item sized pool:", len(list1))
-    # print("Confusion item sized pool:", len(list2))
-    # print("Pool size for incorrect answers:", len(pool))
-    needed = num_choices - 1
-    if needed > 0 and not pool:
-        raise ValueError("not enough items to build choices")
-
-    if needed <= len(pool):
-        others = random.sample(pool, needed)
-    else:
-        others = [random.choice(pool) for _ in range(needed)]
-
-    # allowed ordered key pairs
-    allowed_pairs = [
-        ("word", "meaning"),
-        ("meaning", "word"),
-        ("word", "pronunciation"),
-        ("pronunciation", "word"),
-        ("meaning", "pronunciation"),
-        ("pronunciation", "meaning")
-    ]
-    possible_pairs = [pair for pair in allowed_pairs if pair[0] in truth and pair[1] in truth]
+def pick_one_of_four_question_data_words(list1: List[Dict[str, Any]],
+                        list2: List[Dict[str, Any]],
+                        num_choices: int,
+                        truth: Dict[str, Any] = None,
+                        rng: random.Random = random) -> tuple:
+    """pick_one_of_four_question_data for words."""
+    return pick_one_of_four_question_data("word", list1, list2, num_choices, truth, rng)
+
+
+def type_the_result_question_data(kind: str,
+                                  list1: List[Dict[str, Any]],
+                                  truth: Dict[str, Any] = None,
+                                  rng: random.Random = random,
+                                  language: str = DEFAULT_LANGUAGE) -> tuple:
+    """
+    Return (question_value, answer_raw_value, instruction) asking to type one field of truth
+    (a random dict from list1 unless given), picked among the typed_pairs of the kind's schema
+    in the given language.
+    """
+    if truth is None:
+        valid1 = [it for it in list1 if isinstance(it, dict)]
+        if not valid1:
+            raise ValueError("first list must contain at least one dict")
+        truth = rng.choice(valid1)
 
+    possible_pairs = [pair for pair in get_schema(kind, language).typed_pairs if pair[0] in truth and pair[1] in truth]
     if not possible_pairs:
-        raise ValueError("truth item must contain a valid key pair (name/char or sound/char)")
-
-    question_key, answer_key = random.choice(possible_pairs)
-    question_value = truth.get(question_key)
+        raise ValueError(f"truth item must contain a valid key pair for typed {kind} questions")
 
-    instruction = question_key.replace("_", " ").capitalize() + " => " + " Select the correct " + answer_key.replace("_", " ") + "."
-    small_buttons = True
-
-    answers = [truth.get(answer_key)] + [it.get(answer_key) for it in others]
-    random.shuffle(answers)
-    correct_index = answers.index(truth.get(answer_key))
-
-    # print("Correct answer:", truth)
-    # print("Incorrect answers:", others)
-
-    return question_value, answers, correct_index, instruction, small_buttons
-
-
-def get_type_the_result_question_data(list1: List[Dict[str, Any]],
-                                    priority_key: str = "letter_priority") -> tuple:
-    valid1 = [it for it in list1 if isinstance(it, dict)]
-    if not valid1:
-        raise ValueError("first list must contain at least one dict")
-    
-    truth = random.choice(valid1)
-
-    # allowed ordered key pairs
-    allowed_pairs = [
-        ("letter_char", "letter_name"),
-        ("letter_char", "letter_sound"),
-    ]
-    possible_pairs = [pair for pair in allowed_pairs if pair[0] in truth and pair[1] in truth]
-
-    if not possible_pairs:
-        raise ValueError("truth item must contain a valid key pair (char => name or char => sound)")
-    
-    question_key, answer_key = random.choice(possible_pairs)
+    question_key, answer_key = rng.choice(possible_pairs)
 
     instruction = "Type the correct <b>" + answer_key.replace("_", " ") + " </b>."
 
@@ -360,27 +297,38 @@ def get_type_the_result_question_data(list1: List[Dict[str, Any]],
     return question_value, answer_raw_value, instruction
 
 
-def check_text_answer_is_valid(answer:str, truth:str) -> bool:
+def get_type_the_result_question_data(list1: List[Dict[str, Any]],
+                                    priority_key: str = "letter_priority",
+                                    truth: Dict[str, Any] = None,
+                                    rng: random.Random = random) -> tuple:
+    """type_the_result_question_data for the kind ordered by priority_key (letters by default)."""
+    schema = schema_for_priority_key(priority_key) or get_schema("letter")
+    return type_the_result_question_data(schema.kind, list1, truth, rng)
+
+
+def check_text_answer_is_valid(answer:str, truth:str, language: str = DEFAULT_LANGUAGE) -> bool:
+    # the answer is normalized once, the expected answers come from normalize_answer's cache
+    answer_norm = normalize_answer(answer, language)
+    # right answers and their accepted variants are a set lookup, typos need the fuzzy match
+    if " ".join(answer_norm.split()) in get_compiled_catalog(language).accepted_answers(truth):
+        return True
+    if normalized_similarity(answer_norm, normalize_answer(truth, language), TEXT_ANSWER_MIN_SIMILARITY) >= TEXT_ANSWER_MIN_SIMILARITY:
+        return True
     # remove parts of characters between parentheses
     alt_truth = truth.split(" (")[0]
-    # compute similarity between the two strings
-    similarity_score = string_similarity(answer, truth)
-    alt_similarity_score = string_similarity(answer, alt_truth)
-
-    similarity = max(similarity_score, alt_similarity_score)
-
-    # print(f"Similarity between {answer} and {truth} or {alt_truth} is {similarity_score} or {alt_similarity_score}")
-
-    if similarity >= 0.8:
-        return True
-    else:
+    if alt_truth == truth:
         return False
+    return normalized_similarity(answer_norm, normalize_answer(alt_truth, language), TEXT_ANSWER_MIN_SIMILARITY) >= TEXT_ANSWER_MIN_SIMILARITY
 
 
 def last_20_percentage(item:dict) -> float:
+    """
+    Share of correct answers among the item's last 20, 0 until it has 20 answers.
+    ProgressTable.mastered computes the same test for every item of a user at once.
+    """
     if len(item.get("last_20_answers", [])) < 20:
         percent = 0
     else:
-        percent = sum(item.get("last_20_answers", []))
+        percent = sum(item.get("last_20_answers", [])[-20:]) / 20
     return percent
 
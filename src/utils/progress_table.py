@@ -0,0 +1,92 @@
+from typing import Any, Dict, List
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency: the same results are computed with plain lists
+    np = None
+
+LAST_ANSWERS = 20
+
+
+class ProgressTable:
+    """
+    Column view of a user's items of one kind: times_learned, times_correct, is_seen and a
+    (items x 20) matrix of the last answers, as NumPy arrays when NumPy is installed (plain lists
+    otherwise). Statistics over every item (the mastered items of a finished quiz, the learned
+    item cards) are then computed in one vectorised pass instead of a Python loop per item.
+    The item dicts stay the source of truth: row i is items[i], and update(item) refreshes an
+    item's row after it changed.
+    """
+
+    def __init__(self, items: List[dict]):
+        self.items = [it for it in items if isinstance(it, dict)]
+        self._rows: Dict[int, int] = {id(it): row for row, it in enumerate(self.items)}
+        size = len(self.items)
+        if np is not None:
+            self.times_learned = np.zeros(size, dtype=np.int64)
+            self.times_correct = np.zeros(size, dtype=np.int64)
+            self.is_seen = np.zeros(size, dtype=bool)
+            # last answers, oldest first, left-aligned; answered counts how many are filled in
+            self.last_answers = np.zeros((size, LAST_ANSWERS), dtype=np.int8)
+            self.answered = np.zeros(size, dtype=np.int64)
+        else:
+            self.times_learned = [0] * size
+            self.times_correct = [0] * size
+            self.is_seen = [False] * size
+            self.last_answers = [[0] * LAST_ANSWERS for _ in range(size)]
+            self.answered = [0] * size
+        for row, item in enumerate(self.items):
+            self._set_row(row, item)
+
+    def _set_row(self, row: int, item: dict) -> None:
+        self.times_learned[row] = item.get("times_learned", 0) or 0
+        self.times_correct[row] = item.get("times_correct", 0) or 0
+        self.is_seen[row] = item.get("is_seen") == True
+        last = [1 if answer else 0 for answer in (item.get("last_20_answers") or [])[-LAST_ANSWERS:]]
+        padded = last + [0] * (LAST_ANSWERS - len(last))
+        if np is not None:
+            self.last_answers[row, :] = padded
+        else:
+            self.last_answers[row] = padded
+        self.answered[row] = len(last)
+
+    def update(self, item: dict) -> None:
+        """Refresh item's row after its progress changed."""
+        row = self._rows.get(id(item))
+        if row is not None:
+            self._set_row(row, item)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def correct_counts(self):
+        """Number of correct answers among each item's last 20."""
+        if np is not None:
+            return self.last_answers.sum(axis=1, dtype=np.int64)
+        return [sum(row) for row in self.last_answers]
+
+    def mastered(self, threshold: float = 0.95):
+        """Mask of the items with a full last-20 window answered at least threshold correctly."""
+        correct = self.correct_counts()
+        if np is not None:
+            return (self.answered == LAST_ANSWERS) & (correct >= threshold * LAST_ANSWERS)
+        return [n == LAST_ANSWERS and c >= threshold * LAST_ANSWERS for c, n in zip(correct, self.answered)]
+
+    def mastered_items(self, threshold: float = 0.95) -> List[dict]:
+        """Returns, in item order, the items selected by mastered(threshold)."""
+        return [item for item, is_mastered in zip(self.items, self.mastered(threshold)) if is_mastered]
+
+    def card_stats(self, is_seen: bool = True) -> List[Dict[str, Any]]:
+        """
+        Returns, in item order, {"item", "correct", "total", "times_learned"} for every item whose
+        is_seen equals is_seen (the numbers shown on the learned item cards).
+        """
+        correct = self.correct_counts()
+        if np is not None:
+            rows = np.flatnonzero(self.is_seen == is_seen).tolist()
+            correct, answered, learned = correct.tolist(), self.answered.tolist(), self.times_learned.tolist()
+        else:
+            rows = [row for row, seen in enumerate(self.is_seen) if seen == is_seen]
+            answered, learned = self.answered, self.times_learned
+        return [{"item": self.items[row], "correct": correct[row], "total": answered[row],
+                 "times_learned": learned[row]} for row in rows]
@@ -0,0 +1,195 @@
+import os
+import random
+import sys
+from typing import Any, Dict, List
+from src.utils.catalog import DEFAULT_LANGUAGE
+from src.utils.item_schema import get_schema
+from src.utils.learning_utils import pick_one_of_four_question_data, type_the_result_question_data, random_question_type
+from src.utils.learning_utils import select_random_items_excluding
+from src.utils.session_store import SessionStore
+from src.utils.spaced_repetition import session_result
+from src.utils.user_utils import UserSession
+
+# A quiz plan is the list of every question of a session, generated once when the learning page
+# renders and kept server-side with the rest of the quiz (see start_quiz); the page only holds
+# the quiz ID, and answering a question only indexes into the plan. Each entry is:
+#   {"type": "pick_one_of_four", "key": item key, "prompt": str, "options": [str, ...],
+#    "correct": 0-based index in options, "instruction": str, "small_buttons": bool}
+#   {"type": "type_the_result", "key": item key, "prompt": str, "answer": str, "instruction": str}
+# "key" is the stable ID (letter char / word, see item_schema) of the item being asked about.
+# Every random choice of a session (its items, wrong answers and plan) is drawn from one
+# random.Random seeded with the session's seed, which is logged and kept with the quiz: replaying
+# the seed against the same user progress regenerates the same questions
+# (python -m src.utils.quiz_plan replay <username> <seed>).
+
+# Items need this many answers before the typed question types are mixed in
+MIN_ANSWERS_FOR_TYPED_QUESTIONS = 20
+
+# Running quizzes: kept in memory, and spilled to this folder so they survive eviction and are
+# shared by every worker process ("" keeps them in memory only)
+QUIZ_SESSION_FOLDER = os.environ.get(
+    "QUIZ_SESSION_FOLDER", os.path.join(os.path.dirname(__file__), '..', 'data', 'user_data', 'sessions'))
+QUIZ_SESSION_MAX_ENTRIES = 256
+
+_quizzes = SessionStore(max_entries=QUIZ_SESSION_MAX_ENTRIES, spill_folder=QUIZ_SESSION_FOLDER or None)
+
+
+def generate_plan(question_items: List[Dict[str, Any]], confusion_items: List[Dict[str, Any]],
+                  num_questions: int, kind: str = "letter", rng: random.Random = random,
+                  language: str = DEFAULT_LANGUAGE) -> List[dict]:
+    """
+    Returns the specs of num_questions questions about question_items, items of the given kind
+    (see above) of the given language, with wrong answers drawn as by the pick-one-of-four builder:
+    from the catalog's distractor pools, confusion_items only standing in for items the catalog
+    does not know. Returns an empty plan if there are no items.
+    """
+    items = [it for it in question_items if isinstance(it, dict)]
+    if not items:
+        return []
+    schema = get_schema(kind, language)
+    min_learned = min(it.get("times_learned", -1) for it in items)
+
+    plan = []
+    for _ in range(num_questions):
+        if min_learned >= MIN_ANSWERS_FOR_TYPED_QUESTIONS:
+            question_type = random_question_type(kind, rng=rng, language=language)
+        else:
+            question_type = "pick_one_of_four"
+        truth = rng.choice(items)
+
+        if question_type == "type_the_result":
+            prompt, answer, instruction = type_the_result_question_data(kind, items, truth=truth, rng=rng,
+                                                                        language=language)
+            plan.append({"type": question_type, "key": truth.get(schema.key_field), "prompt": prompt,
+                         "answer": answer, "instruction": instruction})
+        else:
+            prompt, options, correct, instruction, small_buttons = pick_one_of_four_question_data(
+                kind, items, confusion_items, num_choices=4, truth=truth, rng=rng, language=language)
+            plan.append({"type": "pick_one_of_four", "key": truth.get(schema.key_field), "prompt": prompt,
+                         "options": options, "correct": correct, "instruction": instruction,
+                         "small_buttons": small_buttons})
+    return plan
+
+
+def new_seed() -> int:
+    """Returns a fresh session seed, drawn from the OS so concurrent workers never share one."""
+    return random.SystemRandom().getrandbits(32)
+
+
+def plan_session(session: UserSession, num_questions: int, kind: str = "letter",
+                 is_practice: bool = False, seed: int = None) -> dict:
+    """
+    Picks the items of a quiz session about items of the given kind (of the user's language) for
+    the user of session and generates its plan, all from random.Random(seed) (a new seed by default).
+    Returns {"seed", "language", "question_items", "confusion_items", "plan"}.
+    """
+    if seed is None:
+        seed = new_seed()
+    rng = random.Random(seed)
+    n = session.settings.get("letters_per_session", 3)
+
+    if is_practice:
+        # practice the items that are most overdue for review
+        question_items = session.pick_due_items(kind, n=n)
+    else:
+        allowed = None
+        if get_schema(kind, session.language).spelling_field:
+            # only words spelled with letters the user has already seen
+            learnable = {id(word) for word in session.learnable_words()}
+            print("Num Thai Words in DATA:", len(learnable))
+            allowed = lambda word: id(word) in learnable
+        question_items = session.pick_items(kind, n=n, is_seen=False, allowed=allowed, rng=rng)
+
+    confusion_items = select_random_items_excluding(kind, question_items, n=10, data=session.items(kind), rng=rng,
+                                                    language=session.language)
+    plan = generate_plan(question_items, confusion_items, num_questions, kind=kind, rng=rng, language=session.language)
+
+    print(f"Quiz session for {session.username}: seed {seed} ({kind}s, {'practice' if is_practice else 'learn'}), "
+          f"{len(question_items)} item(s), {len(confusion_items)} confusion item(s)")
+    return {"seed": seed, "language": session.language, "question_items": question_items, "confusion_items": confusion_items, "plan": plan}
+
+
+def start_quiz(session: UserSession, num_questions: int, kind: str = "letter", is_practice: bool = False) -> str:
+    """
+    Plans a quiz session (see plan_session) and stores it server-side.
+    Returns the quiz ID for the page to keep; get_quiz(quiz_id) returns
+    {"username", "language", "kind", "is_practice", "seed", "question_keys", "baseline", "plan"}, where
+    baseline holds each question item's [times_learned, times_correct] when the quiz started.
+    """
+    quiz = plan_session(session, num_questions, kind=kind, is_practice=is_practice)
+    key_field = get_schema(kind, session.language).key_field
+    question_keys = [item.get(key_field) for item in quiz["question_items"]]
+    return _quizzes.create({
+        "username": session.username,
+        "language": session.language,
+        "kind": kind,
+        "is_practice": is_practice,
+        "seed": quiz["seed"],
+        "question_keys": question_keys,
+        "baseline": {key: [item.get("times_learned", 0), item.get("times_correct", 0)]
+                     for key, item in zip(question_keys, quiz["question_items"])},
+        "plan": quiz["plan"],
+    })
+
+
+def review_quiz(session: UserSession, quiz: dict) -> None:
+    """
+    Reviews the spaced repetition schedule of every item the quiz asked about, once, with the
+    item's result over the whole quiz (its answers since the quiz started, see start_quiz).
+    """
+    kind = quiz["kind"]
+    for key, (learned_before, correct_before) in quiz.get("baseline", {}).items():
+        item = session.find_item(kind, key)
+        if item is None:
+            continue
+        result = session_result(item.get("times_learned", 0) - learned_before,
+                                item.get("times_correct", 0) - correct_before)
+        if result is not None:
+            session.review_item(kind, key, result)
+
+
+def get_quiz(quiz_id: str) -> dict:
+    """Returns the quiz stored by start_quiz, or None if it is unknown or expired."""
+    return _quizzes.get(quiz_id)
+
+
+def end_quiz(quiz_id: str) -> None:
+    """Forget a finished quiz."""
+    _quizzes.discard(quiz_id)
+
+
+def replay(username: str, seed: int, num_questions: int = 20, kind: str = "letter",
+           is_practice: bool = False) -> dict:
+    """
+    Regenerates the session of seed for username without changing the user's progress.
+    The questions are the ones the user was given as long as their progress has not changed
+    since the session started.
+    """
+    with UserSession(username) as session:
+        return plan_session(session, num_questions, kind=kind, is_practice=is_practice, seed=seed)
+
+
+def _print_plan(session: dict, kind: str) -> None:
+    key_field = get_schema(kind, session["language"]).key_field
+    print("Question items:", [it.get(key_field) for it in session["question_items"]])
+    print("Confusion items:", [it.get(key_field) for it in session["confusion_items"]])
+    for number, question in enumerate(session["plan"], start=1):
+        if question["type"] == "pick_one_of_four":
+            options = ", ".join(("*" if i == question["correct"] else "") + str(option)
+                                for i, option in enumerate(question["options"]))
+            print(f"{number:3}. [{question['key']}] {question['prompt']} -> {options}")
+        else:
+            print(f"{number:3}. [{question['key']}] {question['prompt']} -> type: {question['answer']}")
+
+
+if __name__ == "__main__":
+    # python -m src.utils.quiz_plan replay <username> <seed> [letter|word] [learn|practice] [num_questions]
+    args = sys.argv[1:]
+    if len(args) < 3 or args[0] != "replay":
+        print("usage: python -m src.utils.quiz_plan replay <username> <seed> [letter|word] [learn|practice] [num_questions]")
+        sys.exit(2)
+    replay_kind = args[3] if len(args) > 3 else "letter"
+    _print_plan(replay(args[1], int(args[2]),
+                       num_questions=int(args[5]) if len(args) > 5 else 20,
+                       kind=replay_kind,
+                       is_practice=(args[4] if len(args) > 4 else "learn") == "practice"), replay_kind)
@@ -0,0 +1,176 @@
+import bisect
+import random
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+def _level(value: Any) -> Any:
+    # numeric priorities are compared as numbers, anything else as is
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+
+class ItemScheduler:
+    """
+    Items of one kind bucketed by (is_seen, priority value), with the distinct priority levels of
+    each side kept sorted, so the lowest-priority items are found without scanning or re-sorting
+    the whole list.
+    - pick() walks the levels from the lowest until the candidate pool holds 2n items, then picks n
+      of them at random, skipping items that repeat a value of unique_keys (e.g. the same sound).
+    - update(item) moves one item to its current bucket after its priority or is_seen changed.
+    The pool is put back in item order before being shuffled, so a seeded rng picks the same items
+    however the buckets were reordered by earlier updates.
+    Items without priority_key, or whose is_seen is neither True nor False, are not scheduled.
+    """
+
+    def __init__(self, items: Iterable[dict], priority_key: str, unique_keys: Tuple[str, ...]):
+        self.priority_key = priority_key
+        self.unique_keys = unique_keys
+        # is_seen -> priority level -> {id(item): item}, insertion ordered
+        self._buckets: Dict[bool, Dict[Any, Dict[int, dict]]] = {True: {}, False: {}}
+        self._levels: Dict[bool, list] = {True: [], False: []}
+        self._counts = {True: 0, False: 0}
+        # id(item) -> (is_seen, level) of the bucket holding it
+        self._where: Dict[int, Tuple[bool, Any]] = {}
+        # id(item) -> position in items
+        self._order: Dict[int, int] = {}
+        for position, item in enumerate(items):
+            self._order[id(item)] = position
+            self.update(item)
+
+    def _place(self, item: dict) -> Optional[Tuple[bool, Any]]:
+        seen = item.get("is_seen")
+        if seen is not True and seen is not False or self.priority_key not in item:
+            return None
+        return seen, _level(item[self.priority_key])
+
+    def update(self, item: dict) -> None:
+        """Re-bucket item according to its current priority and is_seen."""
+        key = id(item)
+        old = self._where.get(key)
+        new = self._place(item)
+        if old == new:
+            return
+        if old is not None:
+            seen, level = old
+            bucket = self._buckets[seen][level]
+            del bucket[key]
+            self._counts[seen] -= 1
+            del self._where[key]
+            if not bucket:
+                del self._buckets[seen][level]
+                levels = self._levels[seen]
+                del levels[bisect.bisect_left(levels, level)]
+        if new is not None:
+            seen, level = new
+            bucket = self._buckets[seen].get(level)
+            if bucket is None:
+                bucket = self._buckets[seen][level] = {}
+                bisect.insort(self._levels[seen], level)
+            bucket[key] = item
+            self._counts[seen] += 1
+            self._where[key] = new
+
+    def count(self, is_seen: bool) -> int:
+        return self._counts[is_seen]
+
+    def pick(self, n: int, is_seen: bool = False, allowed: Optional[Callable[[dict], bool]] = None,
+             rng: random.Random = random) -> List[dict]:
+        """
+        Returns up to n items with is_seen equal to is_seen, chosen at random among the
+        lowest-priority ones, with no two items sharing a value of unique_keys.
+        If allowed is given, only items for which it returns True are considered.
+        rng is the random.Random drawing the items (default: the random module).
+        """
+        if n <= 0 or not self._counts[is_seen]:
+            return []
+
+        pool_size = min(n * 2, self._counts[is_seen])
+        pool: List[dict] = []
+        stale: List[dict] = []
+        for level in self._levels[is_seen]:
+            for item in self._buckets[is_seen][level].values():
+                if self._place(item) != (is_seen, level):
+                    # changed without update(): re-bucketed below, skipped this time
+                    stale.append(item)
+                elif allowed is None or allowed(item):
+                    pool.append(item)
+            if len(pool) >= pool_size:
+                break
+        for item in stale:
+            self.update(item)
+
+        pool.sort(key=lambda item: self._order.get(id(item), len(self._order)))
+        rng.shuffle(pool)
+        selected: List[dict] = []
+        used = [set() for _ in self.unique_keys]
+        for item in pool:
+            values = [item.get(k) for k in self.unique_keys]
+            # skip if would duplicate a seen value (only consider non-None values)
+            if any(v is not None and v in u for v, u in zip(values, used)):
+                continue
+            selected.append(item)
+            for v, u in zip(values, used):
+                if v is not None:
+                    u.add(v)
+            if len(selected) >= n:
+                break
+        return selected
+
+
+class LearnableWords:
+    """
+    Per-user counters of how many distinct letters of each word the user has not seen yet.
+    A word is learnable once its counter is zero, so listing or counting the learnable words
+    needs no scan; marking a letter as seen only touches the words spelled with it (found through
+    the inverted letter -> words index of the compiled catalog).
+    Word IDs are positions in the user's word list. word_schema and letter_schema are the item
+    schemas of the words and of the letters they are spelled with (see item_schema).
+    """
+
+    def __init__(self, letters: Iterable[dict], words: List[dict], word_schema, letter_schema, catalog=None):
+        self.words = words
+        self._letter_key = letter_schema.key_field
+        word_key = word_schema.key_field
+        if catalog is not None and len(catalog.word_letters) == len(words) and \
+                all(catalog.key_of(word_schema.kind, i) == word.get(word_key) for i, word in enumerate(words)):
+            self._word_letters = catalog.word_letters
+            self._by_letter = catalog.words_by_letter
+        else:
+            # the user's words differ from the catalog (e.g. an uploaded document): index them here
+            self._word_letters = [frozenset(word.get(word_schema.spelling_field) or ()) for word in words]
+            by_letter: Dict[str, list] = {}
+            for word_id, letters_of_word in enumerate(self._word_letters):
+                for letter in letters_of_word:
+                    by_letter.setdefault(letter, []).append(word_id)
+            self._by_letter = by_letter
+
+        self._seen = {it.get(self._letter_key) for it in letters if it.get("is_seen") == True}
+        self._missing = [len(letters_of_word - self._seen) for letters_of_word in self._word_letters]
+        self._learnable = {word_id for word_id, missing in enumerate(self._missing) if missing == 0}
+
+    def update(self, letter: dict) -> None:
+        """Adjust the counters after letter's is_seen changed."""
+        char = letter.get(self._letter_key)
+        seen = letter.get("is_seen") == True
+        if seen == (char in self._seen):
+            return
+        if seen:
+            self._seen.add(char)
+            for word_id in self._by_letter.get(char, ()):
+                self._missing[word_id] -= 1
+                if self._missing[word_id] == 0:
+                    self._learnable.add(word_id)
+        else:
+            self._seen.discard(char)
+            for word_id in self._by_letter.get(char, ()):
+                self._missing[word_id] += 1
+                self._learnable.discard(word_id)
+
+    def __len__(self) -> int:
+        return len(self._learnable)
+
+    def learnable(self) -> List[dict]:
+        """Returns the learnable words, in the user's word order."""
+        return [self.words[word_id] for word_id in sorted(self._learnable)]
@@ -0,0 +1,185 @@
+import json
+import os
+import struct
+import sys
+from typing import Any, List, Tuple
+from src.utils.file_utils import atomic_write
+
+# Serialization formats for user documents:
+#   "json"    - indented JSON (the original, human readable layout)
+#   "compact" - JSON without indentation or spaces after separators
+#   "binary"  - stdlib-only tagged binary encoding (see below), prefixed with BINARY_MAGIC;
+#               about a third of the compact size, but decoded in pure Python (slower than json)
+# Reading auto-detects the format, so files can be converted one at a time.
+FORMATS = ("json", "compact", "binary")
+DEFAULT_FORMAT = "compact"
+
+# Binary layout: every value is a one byte tag followed by its payload.
+# Integers and lengths are zigzag/unsigned varints; floats are little-endian doubles.
+# A string seen before in the same document is written as a back-reference to its first
+# occurrence, so repeated keys ("times_learned", "last_20_answers", ...) cost 2-3 bytes.
+BINARY_MAGIC = b"LWAB\x01"
+_NONE, _TRUE, _FALSE, _INT, _FLOAT, _STR, _STR_REF, _LIST, _DICT = b"NTFidsrlm"
+_DOUBLE = struct.Struct("<d")
+
+
+def dumps(document: Any, fmt: str = DEFAULT_FORMAT) -> bytes:
+    """Returns document encoded in the given format."""
+    if fmt == "json":
+        return json.dumps(document, ensure_ascii=False, indent=4).encode("utf-8")
+    if fmt == "compact":
+        return json.dumps(document, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if fmt == "binary":
+        out = bytearray(BINARY_MAGIC)
+        _encode(document, out, {})
+        return bytes(out)
+    raise ValueError(f"Unknown serialization format: {fmt}")
+
+
+def detect_format(data: bytes) -> str:
+    """Returns "binary" for binary documents, "json" for (pretty or compact) JSON."""
+    return "binary" if data.startswith(BINARY_MAGIC) else "json"
+
+
+def loads(data: bytes) -> Any:
+    """
+    Decode a document written by dumps in any format (detected from its content).
+    Raises ValueError if the data is corrupt.
+    """
+    if detect_format(data) == "binary":
+        strings: List[str] = []
+        try:
+            value, pos = _decode(memoryview(data), len(BINARY_MAGIC), strings)
+        except (IndexError, struct.error) as e:
+            raise ValueError(f"Truncated binary document: {e}") from e
+        if pos != len(data):
+            raise ValueError("Trailing bytes after binary document")
+        return value
+    return json.loads(data.decode("utf-8"))
+
+
+def _write_varint(out: bytearray, n: int) -> None:
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(data: memoryview, pos: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _encode(value: Any, out: bytearray, strings: dict) -> None:
+    if value is None:
+        out.append(_NONE)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif isinstance(value, int):
+        out.append(_INT)
+        _write_varint(out, value * 2 if value >= 0 else -value * 2 - 1)
+    elif isinstance(value, float):
+        out.append(_FLOAT)
+        out += _DOUBLE.pack(value)
+    elif isinstance(value, str):
+        ref = strings.get(value)
+        if ref is not None:
+            out.append(_STR_REF)
+            _write_varint(out, ref)
+        else:
+            strings[value] = len(strings)
+            raw = value.encode("utf-8")
+            out.append(_STR)
+            _write_varint(out, len(raw))
+            out += raw
+    elif isinstance(value, (list, tuple)):
+        out.append(_LIST)
+        _write_varint(out, len(value))
+        for item in value:
+            _encode(item, out, strings)
+    elif isinstance(value, dict):
+        out.append(_DICT)
+        _write_varint(out, len(value))
+        for key, item in value.items():
+            _encode(key, out, strings)
+            _encode(item, out, strings)
+    else:
+        raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _decode(data: memoryview, pos: int, strings: List[str]) -> Tuple[Any, int]:
+    tag = data[pos]
+    pos += 1
+    if tag == _STR_REF:
+        ref, pos = _read_varint(data, pos)
+        return strings[ref], pos
+    if tag == _STR:
+        length, pos = _read_varint(data, pos)
+        value = str(data[pos:pos + length], "utf-8")
+        strings.append(value)
+        return value, pos + length
+    if tag == _INT:
+        n, pos = _read_varint(data, pos)
+        return (n >> 1) if not n & 1 else -((n + 1) >> 1), pos
+    if tag == _DICT:
+        count, pos = _read_varint(data, pos)
+        result = {}
+        for _ in range(count):
+            key, pos = _decode(data, pos, strings)
+            result[key], pos = _decode(data, pos, strings)
+        return result, pos
+    if tag == _LIST:
+        count, pos = _read_varint(data, pos)
+        result = []
+        for _ in range(count):
+            item, pos = _decode(data, pos, strings)
+            result.append(item)
+        return result, pos
+    if tag == _TRUE:
+        return True, pos
+    if tag == _FALSE:
+        return False, pos
+    if tag == _NONE:
+        return None, pos
+    if tag == _FLOAT:
+        return _DOUBLE.unpack_from(data, pos)[0], pos + _DOUBLE.size
+    raise ValueError(f"Unknown tag {tag!r} at byte {pos - 1}")
+
+
+def convert_file(path: str, fmt: str) -> bool:
+    """
+    Rewrite the document at path in the given format (atomically).
+    Returns True if the file was converted, False if it could not be read or written.
+    """
+    try:
+        with open(path, "rb") as f:
+            document = loads(f.read())
+    except (ValueError, OSError) as e:
+        print(f"Skipping {path}: {e}")
+        return False
+    data = dumps(document, fmt)
+    return atomic_write(path, lambda f: f.write(data), mode="wb")
+
+
+if __name__ == "__main__":
+    # Usage: python -m src.utils.serializer convert <json|compact|binary> [user_folder]
+    # Stop the app first: this rewrites files outside the per-user locks.
+    if len(sys.argv) < 3 or sys.argv[1] != "convert" or sys.argv[2] not in FORMATS:
+        print("Usage: python -m src.utils.serializer convert <json|compact|binary> [user_folder]")
+        sys.exit(1)
+    folder = sys.argv[3] if len(sys.argv) > 3 else os.path.join(os.path.dirname(__file__), '..', 'data', 'user_data', 'user_data')
+    converted = 0
+    for filename in sorted(os.listdir(folder)):
+        if filename.endswith(".json") and convert_file(os.path.join(folder, filename), sys.argv[2]):
+            converted += 1
+            print(f"Converted {filename}")
+    print(f"Converted {converted} user file(s) to {sys.argv[2]}")
@@ -0,0 +1,118 @@
+import json
+import os
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from src.utils.file_utils import atomic_write
+
+_SESSION_ID = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+
+
+class SessionStore:
+    """
+    Server-side state of browser sessions (e.g. a quiz's plan), so pages only keep an opaque
+    session ID in a dcc.Store instead of shipping the state back and forth on every callback.
+    - States are kept in memory in LRU order, up to max_entries.
+    - With a spill_folder, every state is also written there as <session id>.json: evicted states
+      are reloaded from disk on their next get(), and other worker processes see them too.
+    - States older than max_age seconds (since their last put()) are dropped.
+    The dicts returned by get() are shared: callers changing them must call put() to persist.
+    """
+
+    def __init__(self, max_entries: int = 256, spill_folder: Optional[str] = None, max_age: float = 24 * 60 * 60):
+        self.max_entries = max_entries
+        self.spill_folder = spill_folder
+        self.max_age = max_age
+        # session id -> (state, time of its last put)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_cleanup = 0.0
+
+    def create(self, state: dict) -> str:
+        """Store state under a new random session ID and return the ID."""
+        session_id = secrets.token_urlsafe(18)
+        self.put(session_id, state)
+        self._cleanup()
+        return session_id
+
+    def put(self, session_id: str, state: dict) -> bool:
+        """Replace the state of session_id. Returns False if the ID is invalid or spilling failed."""
+        if not _SESSION_ID.match(session_id or ""):
+            return False
+        now = time.time()
+        with self._lock:
+            self._entries[session_id] = (state, now)
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        if self.spill_folder is None:
+            return True
+        return atomic_write(self._path(session_id), lambda f: json.dump(state, f, ensure_ascii=False, separators=(",", ":")))
+
+    def get(self, session_id: str) -> Optional[dict]:
+        """Returns the state of session_id, or None if it is unknown, expired or invalid."""
+        if not isinstance(session_id, str) or not _SESSION_ID.match(session_id):
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None:
+                if now - entry[1] <= self.max_age:
+                    self._entries.move_to_end(session_id)
+                    return entry[0]
+                del self._entries[session_id]
+        if self.spill_folder is None:
+            return None
+
+        path = self._path(session_id)
+        try:
+            saved_at = os.path.getmtime(path)
+            if now - saved_at > self.max_age:
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        with self._lock:
+            self._entries[session_id] = (state, saved_at)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return state
+
+    def discard(self, session_id: str) -> None:
+        """Forget the state of session_id."""
+        if not isinstance(session_id, str) or not _SESSION_ID.match(session_id):
+            return
+        with self._lock:
+            self._entries.pop(session_id, None)
+        if self.spill_folder is not None:
+            try:
+                os.remove(self._path(session_id))
+            except OSError:
+                pass
+
+    def _path(self, session_id: str) -> str:
+        return os.path.join(self.spill_folder, f"{session_id}.json")
+
+    def _cleanup(self) -> None:
+        # drop expired spilled states, at most once per max_age / 24
+        now = time.time()
+        if self.spill_folder is None or now < self._next_cleanup:
+            return
+        self._next_cleanup = now + self.max_age / 24
+        try:
+            names = os.listdir(self.spill_folder)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.spill_folder, name)
+            try:
+                if now - os.path.getmtime(path) > self.max_age:
+                    os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,144 @@
+import heapq
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# SM-2 spaced repetition state stored on every answered item:
+#   sr_due      - unix time the item is next due for review
+#   sr_interval - current review interval in days (0 while relearning)
+#   sr_ease     - ease factor, grows with easy answers and shrinks with failed ones
+#   sr_reps     - number of consecutive successful reviews
+SR_FIELDS = ("sr_due", "sr_interval", "sr_ease", "sr_reps")
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+DAY_SECONDS = 24 * 60 * 60
+RELEARN_SECONDS = 10 * 60  # a failed item comes back after 10 minutes
+
+# The app only knows right/wrong, mapped onto SM-2's 0-5 answer quality
+CORRECT_QUALITY = 4
+WRONG_QUALITY = 1
+
+# Share of an item's answers in one quiz that must be right for the quiz to count as a success
+SESSION_PASS_RATIO = 0.8
+
+
+def review(item: dict, result: bool, now: Optional[float] = None) -> dict:
+    """
+    Returns the new SM-2 fields of item after one answer given at now (default: the current time).
+    Items that were never reviewed start with reps 0, interval 0 and the default ease.
+    """
+    if now is None:
+        now = time.time()
+    ease = item.get("sr_ease", DEFAULT_EASE)
+    reps = item.get("sr_reps", 0)
+    interval = item.get("sr_interval", 0)
+
+    quality = CORRECT_QUALITY if result else WRONG_QUALITY
+    ease = max(MIN_EASE, round(ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02), 2))
+    if not result:
+        reps = 0
+        interval = 0
+        due = now + RELEARN_SECONDS
+    else:
+        if reps == 0:
+            interval = 1
+        elif reps == 1:
+            interval = 6
+        else:
+            interval = round(interval * ease)
+        reps += 1
+        due = now + interval * DAY_SECONDS
+    return {"sr_due": int(due), "sr_interval": interval, "sr_ease": ease, "sr_reps": reps}
+
+
+def session_result(answered: int, correct: int) -> Optional[bool]:
+    """
+    Returns the result to review an item with after a quiz that asked about it answered times,
+    correct of them right: a quiz asks about a few items many times, so the item is reviewed
+    once with whether at least SESSION_PASS_RATIO of its answers were right (None if not asked).
+    """
+    if answered <= 0:
+        return None
+    return correct >= SESSION_PASS_RATIO * answered
+
+
+def due_time(item: dict) -> int:
+    """Returns when item is due; seen items that were never reviewed are due immediately."""
+    return item.get("sr_due", 0)
+
+
+class DueQueue:
+    """
+    Min-heap of a user's seen items keyed by due time, so a practice session takes the n most
+    overdue items in O(n log N) instead of scanning and sorting every seen item.
+    - update(item) (re)schedules one item after its due time or is_seen changed.
+    - Heap entries are never removed in place: an entry is skipped when it no longer matches the
+      item's current due time, and the heap is rebuilt once stale entries outnumber live ones.
+    Items due at the same time come out in item order, so a session's pick is reproducible.
+    """
+
+    def __init__(self, items: Iterable[dict], unique_keys: Tuple[str, ...]):
+        self.unique_keys = unique_keys
+        # entries are keyed by the item's position in items, which also breaks ties in due time
+        self._rows: Dict[int, int] = {}
+        self._items: Dict[int, dict] = {}
+        # row -> due time of its live heap entry
+        self._live: Dict[int, int] = {}
+        self._heap: List[Tuple[int, int]] = []
+        for row, item in enumerate(items):
+            self._rows[id(item)] = row
+            if item.get("is_seen") == True:
+                self._items[row] = item
+                self._live[row] = due_time(item)
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        self._heap = [(due, key) for key, due in self._live.items()]
+        heapq.heapify(self._heap)
+
+    def update(self, item: dict) -> None:
+        """Re-schedule item according to its current due time and is_seen."""
+        key = self._rows.setdefault(id(item), len(self._rows))
+        if item.get("is_seen") != True:
+            self._items.pop(key, None)
+            self._live.pop(key, None)
+            return
+        due = due_time(item)
+        if self._live.get(key) == due:
+            return
+        self._items[key] = item
+        self._live[key] = due
+        heapq.heappush(self._heap, (due, key))
+        if len(self._heap) > 2 * len(self._live) + 16:
+            self._rebuild()
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def pick(self, n: int) -> List[dict]:
+        """
+        Returns up to n seen items, most overdue first (falling back to the ones due soonest),
+        with no two items sharing a value of unique_keys.
+        """
+        selected: List[dict] = []
+        popped: List[Tuple[int, int]] = []
+        used = [set() for _ in self.unique_keys]
+        while self._heap and len(selected) < n:
+            due, key = heapq.heappop(self._heap)
+            if self._live.get(key) != due:
+                continue  # stale entry
+            item = self._items[key]
+            if item.get("is_seen") != True or due_time(item) != due:
+                # changed without update() (e.g. answered): re-schedule and look again
+                self.update(item)
+                continue
+            popped.append((due, key))
+            values = [item.get(k) for k in self.unique_keys]
+            if any(v is not None and v in u for v, u in zip(values, used)):
+                continue
+            selected.append(item)
+            for v, u in zip(values, used):
+                if v is not None:
+                    u.add(v)
+        for entry in popped:
+            heapq.heappush(self._heap, entry)
+        return selected
@@ -1,4 +1,42 @@
+import functools
+import re
 import unicodedata
+from typing import Dict, Optional
+
+# IPA sequences replaced by plain-text equivalents before typed answers are compared, per language
+IPA_EQUIVALENTS = {
+    "thai": {
+        "t͡ɕʰ": "ch",
+        "t͡ɕ": "ch",
+        "ɕ": "sh",
+        "ʃ": "sh",
+        "ʰ": "",     # aspiration marker
+        "ŋ": "ng",
+        "ɲ": "ny",
+        "ʔ": "",
+        "ː":":"
+        # add more as needed
+    },
+}
+DEFAULT_LANGUAGE = "thai"
+
+# Equivalent romanisations of the same sound, per language: an expected answer containing either
+# spelling of a pair also accepts the other (see answer_variants)
+ROMANISATION_ALIASES = {
+    "thai": (
+        ("ue", "eu"),
+        ("aa", "a:"),
+        ("ii", "i:"),
+        ("uu", "u:"),
+        ("ee", "e:"),
+        ("oo", "o:"),
+    ),
+}
+
+_PARENTHETICAL = re.compile(r"\s*\([^)]*\)")
+
+_ipa_patterns: Dict[str, "re.Pattern"] = {}
+
 
 def normalize_string(s: str, ipa_map: dict) -> str:
     """
@@ -17,55 +55,123 @@ def normalize_string(s: str, ipa_map: dict) -> str:
     return s.lower()
 
 
-def levenshtein_distance(a: str, b: str) -> int:
-    """Classic Levenshtein distance (edit distance)."""
+def _ipa_pattern(language: str) -> "re.Pattern":
+    # one alternation of every IPA sequence, longest first so the longest match wins
+    pattern = _ipa_patterns.get(language)
+    if pattern is None:
+        ipa_map = IPA_EQUIVALENTS.get(language, {})
+        if ipa_map:
+            pattern = re.compile("|".join(re.escape(ipa) for ipa in sorted(ipa_map, key=lambda ipa: -len(ipa))))
+        else:
+            pattern = re.compile(r"(?!)")  # matches nothing
+        _ipa_patterns[language] = pattern
+    return pattern
+
+
+@functools.lru_cache(maxsize=4096)
+def normalize_answer(s: str, language: str = DEFAULT_LANGUAGE) -> str:
+    """
+    normalize_string with the language's IPA map compiled once into a single regex, cached per
+    string (the expected answers repeat all the time). Plain ASCII input is only lowercased.
+    """
+    if not s.isascii():
+        s = unicodedata.normalize("NFKD", s)
+        ipa_map = IPA_EQUIVALENTS.get(language, {})
+        s = _ipa_pattern(language).sub(lambda m: ipa_map[m.group(0)], s)
+    s = s.lower()
+    # NFKD turns the aspiration marker into a plain "h" before the IPA map sees it
+    if s == "chh":
+        s = "ch"
+    return s
+
+
+def levenshtein_distance(a: str, b: str, max_distance: Optional[int] = None) -> int:
+    """
+    Classic Levenshtein distance (edit distance).
+    With max_distance, only the diagonal band of width max_distance is computed and the
+    computation stops as soon as the distance is known to exceed it: max_distance + 1 is then
+    returned for any larger distance.
+    """
     if len(a) < len(b):
         a, b = b, a
 
-    previous_row = list(range(len(b) + 1))
+    if max_distance is None:
+        previous_row = list(range(len(b) + 1))
+        for i, ca in enumerate(a, 1):
+            current_row = [i]
+            for j, cb in enumerate(b, 1):
+                insert = previous_row[j] + 1
+                delete = current_row[j - 1] + 1
+                replace = previous_row[j - 1] + (ca != cb)
+                current_row.append(min(insert, delete, replace))
+            previous_row = current_row
+
+        return previous_row[-1]
+
+    over = max_distance + 1
+    if len(a) - len(b) > max_distance:
+        return over
+    if a == b:
+        return 0
+
+    # cells outside the band are over the bound and stay at over
+    previous_row = [j if j <= max_distance else over for j in range(len(b) + 1)]
     for i, ca in enumerate(a, 1):
-        current_row = [i]
-        for j, cb in enumerate(b, 1):
-            insert = previous_row[j] + 1
-            delete = current_row[j - 1] + 1
-            replace = previous_row[j - 1] + (ca != cb)
-            current_row.append(min(insert, delete, replace))
+        current_row = [over] * (len(b) + 1)
+        current_row[0] = i if i <= max_distance else over
+        row_min = current_row[0]
+        for j in range(max(1, i - max_distance), min(len(b), i + max_distance) + 1):
+            value = min(previous_row[j] + 1, current_row[j - 1] + 1, previous_row[j - 1] + (ca != b[j - 1]))
+            if value > over:
+                value = over
+            current_row[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            # every path through this row is already over the bound
+            return over
         previous_row = current_row
 
     return previous_row[-1]
 
 
-def string_similarity(a: str, b: str) -> float:
+def normalized_similarity(a_norm: str, b_norm: str, min_similarity: Optional[float] = None) -> float:
     """
-    Returns a similarity score between 0 and 1.
+    Similarity between 0 and 1 of two normalized strings (see normalize_answer).
+    With min_similarity, the edit distance is bounded so that pairs that cannot reach it are
+    rejected early; scores below min_similarity are then only upper bounds.
     """
-    ipa_equivalents = {
-        "t͡ɕʰ": "ch",
-        "t͡ɕ": "ch",
-        "ɕ": "sh",
-        "ʃ": "sh",
-        "ʰ": "",     # aspiration marker
-        "ŋ": "ng",
-        "ɲ": "ny",
-        "ʔ": "",
-        "ː":":"
-        # add more as needed
-    }
-
-    a_norm = normalize_string(a, ipa_equivalents)
-    b_norm = normalize_string(b, ipa_equivalents)
-
-    if a_norm == "chh":
-        a_norm = "ch"
-    if b_norm == "chh":
-        b_norm = "ch"
-
-    # print(f"Normalised a = {a_norm}\nNormalised b = {b_norm}")
-
     if not a_norm and not b_norm:
         return 1.0
 
-    distance = levenshtein_distance(a_norm, b_norm)
     max_len = max(len(a_norm), len(b_norm))
+    max_distance = None
+    if min_similarity is not None:
+        # one extra edit of slack so the exact comparison below decides borderline scores
+        max_distance = int((1.0 - min_similarity) * max_len) + 1
+    distance = levenshtein_distance(a_norm, b_norm, max_distance)
 
     return 1.0 - (distance / max_len)
+
+
+@functools.lru_cache(maxsize=4096)
+def answer_variants(value: str, language: str = DEFAULT_LANGUAGE) -> frozenset:
+    """
+    Returns every normalized typed answer accepted as exactly right for the expected answer value:
+    - value itself and value without its parenthetical parts ("sara a (short)" -> "sara a")
+    - each slash-separated alternative ("kh / k" -> "kh", "k")
+    - the language's romanisation aliases of these ("vowel reu" -> "vowel rue")
+    - all of these with their spaces collapsed or removed ("ko kai" -> "kokai")
+    """
+    base = normalize_answer(value, language)
+    forms = {base, _PARENTHETICAL.sub("", base)}
+    for form in list(forms):
+        if "/" in form:
+            forms.update(form.split("/"))
+    forms = {" ".join(form.split()) for form in forms}
+    for spelling, alias in ROMANISATION_ALIASES.get(language, ()):
+        forms |= {form.replace(spelling, alias) for form in forms if spelling in form}
+        forms |= {form.replace(alias, spelling) for form in forms if alias in form}
+    forms |= {form.replace(" ", "") for form in forms}
+    forms.discard("")
+    return frozenset(forms)
@@ -0,0 +1,150 @@
+import atexit
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Dict, Optional
+
+
+class UserDocumentCache:
+    """
+    In-process write-back cache for parsed user documents.
+    - Documents are kept in memory in LRU order, up to max_entries.
+    - put() only marks a document as dirty; dirty documents are written by a background timer,
+      on flush() and at interpreter shutdown. Only clean documents are evicted.
+    - Clean entries are revalidated against a cheap token (e.g. file mtime/size) so that writes
+      made by another process are picked up on the next read.
+    The dicts returned by get() are shared: callers mutating them must call put() to persist.
+    """
+
+    def __init__(self,
+                 load: Callable[[str], Optional[dict]],
+                 store: Callable[[str, dict], bool],
+                 token: Callable[[str], Any],
+                 max_entries: int = 64,
+                 flush_interval: float = 5.0,
+                 lock: Optional[Callable[[str], ContextManager]] = None):
+        self._load = load
+        self._store = store
+        self._token = token
+        # per-document lock taken around writes, before the cache's own lock
+        self._key_lock = lock or (lambda username: nullcontext())
+        self.max_entries = max_entries
+        self.flush_interval = flush_interval
+        # username -> {"data": dict, "dirty": bool, "token": Any}
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._timer: Optional[threading.Thread] = None
+        atexit.register(self.close)
+
+    def get(self, username: str) -> Optional[dict]:
+        """
+        Return the cached document for username, loading it on a miss.
+        Returns None if the document does not exist or cannot be loaded.
+        """
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is not None:
+                if entry["dirty"] or entry["token"] == self._token(username):
+                    self._entries.move_to_end(username)
+                    return entry["data"]
+                # the file changed underneath us (another worker wrote it), reload it
+                del self._entries[username]
+
+            token = self._token(username)
+            data = self._load(username)
+            if data is None:
+                return None
+            self._entries[username] = {"data": data, "dirty": False, "token": token}
+            self._evict()
+            return data
+
+    def put(self, username: str, data: dict) -> bool:
+        """
+        Replace the cached document for username and mark it dirty.
+        The document is written to disk asynchronously.
+        """
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None:
+                self._entries[username] = {"data": data, "dirty": True, "token": None}
+            else:
+                entry["data"] = data
+                entry["dirty"] = True
+                self._entries.move_to_end(username)
+            self._evict()
+        self._start_timer()
+        return True
+
+    def revalidate(self, username: str) -> None:
+        """
+        Record the current token for username's cached entry, after this process changed
+        the underlying storage itself (so the change is not mistaken for another writer's).
+        """
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is not None and not entry["dirty"]:
+                entry["token"] = self._token(username)
+
+    def invalidate(self, username: str) -> None:
+        """Drop the cached document for username without writing it."""
+        with self._lock:
+            self._entries.pop(username, None)
+
+    def flush(self, username: Optional[str] = None) -> bool:
+        """
+        Write dirty documents to disk (only username's if given, otherwise all of them).
+        Returns False if any write failed; failed documents stay dirty and are retried later.
+        """
+        with self._lock:
+            usernames = [username] if username is not None else [name for name, entry in self._entries.items() if entry["dirty"]]
+        ok = True
+        for name in usernames:
+            # lock order is always document lock, then cache lock
+            with self._key_lock(name):
+                with self._lock:
+                    entry = self._entries.get(name)
+                    if entry is None or not entry["dirty"]:
+                        continue
+                    ok = self._write(name, entry) and ok
+        with self._lock:
+            self._evict()
+        return ok
+
+    def close(self) -> None:
+        """Stop the background timer and flush every dirty document."""
+        self._stop.set()
+        self.flush()
+
+    def _write(self, username: str, entry: Dict[str, Any]) -> bool:
+        try:
+            saved = self._store(username, entry["data"])
+        except (RuntimeError, ValueError, TypeError):
+            # the document was being mutated during serialisation, retry on the next flush
+            saved = False
+        if saved:
+            entry["dirty"] = False
+            entry["token"] = self._token(username)
+        return saved
+
+    def _evict(self) -> None:
+        # dirty documents are never written from here (that would take their document lock while
+        # holding the cache lock); they stay cached until the next flush has written them
+        excess = len(self._entries) - self.max_entries
+        if excess <= 0:
+            return
+        for username in [name for name, entry in self._entries.items() if not entry["dirty"]][:excess]:
+            del self._entries[username]
+
+    def _start_timer(self) -> None:
+        if self._timer is not None or self.flush_interval <= 0:
+            return
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._timer = threading.Thread(target=self._run_timer, name="user-cache-flush", daemon=True)
+            self._timer.start()
+
+    def _run_timer(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
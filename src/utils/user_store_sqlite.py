@@ -0,0 +1,403 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+from typing import Any, Dict, List, Optional
+from src.utils import serializer
+from src.utils.catalog import expand_progress
+from src.utils.item_schema import DEFAULT_LANGUAGE, language_schemas, spelled_schema
+
+# Define the database file path relative to this file
+DB_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'user_data', 'users.db')
+
+# Per item type of the default language (see item_schema): table name, document section, natural
+# key column, lookup columns and typed columns (besides username/position/extra): the item's
+# fields, then its progress. Users of other languages keep their items in users.extra.
+PROGRESS_COLUMNS = ["is_seen", "times_learned", "times_correct", "last_20_answers"]
+ITEM_TABLES = {
+    kind: {
+        "table": f"{kind}_progress",
+        "section": schema.section,
+        "key": schema.key_field,
+        "lookup": list(schema.lookup_fields),
+        "columns": list(schema.fields) + PROGRESS_COLUMNS,
+        "priority": schema.priority_key,
+    }
+    for kind, schema in language_schemas(DEFAULT_LANGUAGE).items()
+}
+# Words and the letters they are spelled with, indexed in the word_letters table
+SPELLED = spelled_schema(DEFAULT_LANGUAGE)
+SPELLED_WITH = ITEM_TABLES[SPELLED.spelling_kind] if SPELLED is not None else None
+JSON_COLUMNS = {"last_20_answers"} | {schema.spelling_field for schema in language_schemas(DEFAULT_LANGUAGE).values() if schema.spelling_field}
+BOOL_COLUMNS = {"is_seen"}
+INTEGER_COLUMNS = {"is_seen", "times_learned", "times_correct"} | {spec["priority"] for spec in ITEM_TABLES.values()}
+STATISTICS_COLUMNS = ["total_sessions", "total_questions", "total_correct"]
+# Statistics the JSON documents keep as counters, which the database derives from its rows instead
+# (e.g. the number of seen items, counted with the is_seen indexes): never stored
+DERIVED_STATISTICS = {"seen_items"}
+
+
+def _item_table_ddl(kind: str, spec: dict) -> str:
+    table, key = spec["table"], spec["key"]
+    columns = ",\n".join(
+        f"    {col} {'INTEGER' if col in INTEGER_COLUMNS else 'TEXT'}{' NOT NULL' if col == key else ''}"
+        for col in spec["columns"]
+    )
+    # one index per lookup column besides the key, and is_seen (named e.g. letter_progress_name)
+    indexes = "".join(
+        f"CREATE INDEX IF NOT EXISTS {table}_{col.split('_', 1)[1] if col.startswith((kind + '_', 'is_')) else col} "
+        f"ON {table}(username, {col});\n"
+        for col in spec["lookup"][1:] + ["is_seen"]
+    )
+    return f"""CREATE TABLE IF NOT EXISTS {table} (
+    username TEXT NOT NULL REFERENCES users(username) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+{columns},
+    extra TEXT NOT NULL DEFAULT '{{}}',
+    PRIMARY KEY (username, {key})
+);
+{indexes}"""
+
+
+def _word_letters_ddl() -> str:
+    if SPELLED is None:
+        return ""
+    word, letter = ITEM_TABLES[SPELLED.kind]["key"], SPELLED_WITH["key"]
+    return f"""CREATE TABLE IF NOT EXISTS word_letters (
+    username TEXT NOT NULL,
+    {word} TEXT NOT NULL,
+    {letter} TEXT NOT NULL,
+    PRIMARY KEY (username, {word}, {letter}),
+    FOREIGN KEY (username, {word}) REFERENCES {ITEM_TABLES[SPELLED.kind]["table"]}(username, {word}) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS word_letters_letter ON word_letters(username, {letter});
+"""
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    settings TEXT,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS statistics (
+    username TEXT PRIMARY KEY REFERENCES users(username) ON DELETE CASCADE,
+    total_sessions INTEGER,
+    total_questions INTEGER,
+    total_correct INTEGER,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+""" + "".join(_item_table_ddl(kind, spec) for kind, spec in ITEM_TABLES.items()) + _word_letters_ddl()
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_ready = set()
+
+
+def get_connection() -> sqlite3.Connection:
+    """
+    Return this thread's connection to DB_FILE, creating the schema on first use.
+    Connections use WAL journaling so readers never block the single writer.
+    """
+    path = os.path.abspath(DB_FILE)
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(path)
+    if conn is not None:
+        return conn
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    with _schema_lock:
+        if path not in _schema_ready:
+            conn.executescript(SCHEMA)
+            _schema_ready.add(path)
+    connections[path] = conn
+    return conn
+
+
+def _item_to_row(username: str, position: int, item: dict, columns: List[str]) -> list:
+    values = [username, position]
+    for col in columns:
+        value = item.get(col)
+        if value is not None and col in JSON_COLUMNS:
+            value = json.dumps(value, ensure_ascii=False)
+        elif value is not None and col in BOOL_COLUMNS:
+            value = 1 if value else 0
+        values.append(value)
+    extra = {k: v for k, v in item.items() if k not in columns}
+    values.append(json.dumps(extra, ensure_ascii=False))
+    return values
+
+
+def _row_to_item(row: sqlite3.Row, columns: List[str]) -> dict:
+    item = {}
+    for col in columns:
+        value = row[col]
+        if value is None:
+            # NULL means the key was absent from the original document
+            continue
+        if col in JSON_COLUMNS:
+            value = json.loads(value)
+        elif col in BOOL_COLUMNS:
+            value = bool(value)
+        item[col] = value
+    item.update(json.loads(row["extra"] or "{}"))
+    return item
+
+
+def user_exists(username: str) -> bool:
+    """Returns True if the database holds a document for username."""
+    row = get_connection().execute("SELECT 1 FROM users WHERE username = ?", (username,)).fetchone()
+    return row is not None
+
+
+def read_document(username: str) -> Optional[dict]:
+    """
+    Rebuild the user's document (same shape as the JSON files) from the database.
+    Returns None if the user does not exist.
+    """
+    conn = get_connection()
+    user = conn.execute("SELECT settings, extra FROM users WHERE username = ?", (username,)).fetchone()
+    if user is None:
+        return None
+
+    document: Dict[str, Any] = {}
+    for kind, spec in ITEM_TABLES.items():
+        rows = conn.execute(f"SELECT * FROM {spec['table']} WHERE username = ? ORDER BY position", (username,))
+        document[spec["section"]] = [_row_to_item(row, spec["columns"]) for row in rows]
+
+    if user["settings"] is not None:
+        document["settings"] = json.loads(user["settings"])
+
+    stats = conn.execute("SELECT * FROM statistics WHERE username = ?", (username,)).fetchone()
+    if stats is not None:
+        statistics = {col: stats[col] for col in STATISTICS_COLUMNS if stats[col] is not None}
+        statistics.update(json.loads(stats["extra"] or "{}"))
+        document["statistics"] = statistics
+
+    document.update(json.loads(user["extra"] or "{}"))
+    return document
+
+
+def write_document(username: str, document: dict) -> bool:
+    """
+    Replace everything stored for username with the given document in one transaction.
+    Returns True if the document was written successfully, False otherwise.
+    """
+    sections = {spec["section"] for spec in ITEM_TABLES.values()}
+    settings = document.get("settings")
+    extra = {k: v for k, v in document.items() if k not in sections and k not in ("settings", "statistics")}
+    conn = get_connection()
+    try:
+        with conn:
+            conn.execute(
+                "INSERT INTO users (username, settings, extra) VALUES (?, ?, ?) "
+                "ON CONFLICT(username) DO UPDATE SET settings = excluded.settings, extra = excluded.extra",
+                (username, json.dumps(settings, ensure_ascii=False) if settings is not None else None,
+                 json.dumps(extra, ensure_ascii=False))
+            )
+
+            conn.execute("DELETE FROM statistics WHERE username = ?", (username,))
+            statistics = document.get("statistics")
+            if isinstance(statistics, dict):
+                _write_statistics(conn, username, statistics)
+
+            conn.execute("DELETE FROM word_letters WHERE username = ?", (username,))
+            for kind, spec in ITEM_TABLES.items():
+                conn.execute(f"DELETE FROM {spec['table']} WHERE username = ?", (username,))
+                items = [it for it in document.get(spec["section"], []) or [] if isinstance(it, dict) and it.get(spec["key"]) is not None]
+                columns = spec["columns"]
+                placeholders = ", ".join("?" for _ in range(len(columns) + 3))
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO {spec['table']} (username, position, {', '.join(columns)}, extra) VALUES ({placeholders})",
+                    [_item_to_row(username, position, item, columns) for position, item in enumerate(items)]
+                )
+                if SPELLED is not None and kind == SPELLED.kind:
+                    conn.executemany(
+                        f"INSERT OR IGNORE INTO word_letters (username, {spec['key']}, {SPELLED_WITH['key']}) VALUES (?, ?, ?)",
+                        [(username, item[spec["key"]], letter) for item in items for letter in (item.get(SPELLED.spelling_field) or [])]
+                    )
+        return True
+    except sqlite3.Error as e:
+        print(f"Error writing user {username} to the database: {e}")
+        return False
+
+
+def _write_statistics(conn: sqlite3.Connection, username: str, statistics: dict) -> None:
+    stats_extra = {k: v for k, v in statistics.items() if k not in STATISTICS_COLUMNS and k not in DERIVED_STATISTICS}
+    conn.execute(
+        "INSERT INTO statistics (username, total_sessions, total_questions, total_correct, extra) "
+        "VALUES (?, ?, ?, ?, ?) ON CONFLICT(username) DO UPDATE SET total_sessions = excluded.total_sessions, "
+        "total_questions = excluded.total_questions, total_correct = excluded.total_correct, extra = excluded.extra",
+        [username] + [statistics.get(col) for col in STATISTICS_COLUMNS] + [json.dumps(stats_extra, ensure_ascii=False)]
+    )
+
+
+def update_rows(username: str, items: list = (), settings: Optional[dict] = None,
+                statistics: Optional[dict] = None, add_sessions: int = 0) -> bool:
+    """
+    Write back the parts of the user's document that changed, in one transaction, each with a
+    single-row statement instead of rewriting the whole document (see write_document):
+    - items: (kind, item) pairs, each item's row is updated from the item (matched on its key)
+    - settings / statistics: the user's new settings / statistics, if given
+    - add_sessions: added to the stored total_sessions
+    Returns True if the changes were written successfully, False otherwise.
+    """
+    conn = get_connection()
+    try:
+        with conn:
+            for kind, item in items:
+                spec = ITEM_TABLES[kind]
+                columns = spec["columns"]
+                # _item_to_row starts with username and position, which are not updated
+                values = _item_to_row(username, 0, item, columns)[2:]
+                conn.execute(
+                    f"UPDATE {spec['table']} SET {', '.join(f'{col} = ?' for col in columns)}, extra = ? "
+                    f"WHERE username = ? AND {spec['key']} = ?",
+                    values + [username, item.get(spec["key"])]
+                )
+            if settings is not None:
+                conn.execute("UPDATE users SET settings = ? WHERE username = ?",
+                             (json.dumps(settings, ensure_ascii=False), username))
+            if statistics is not None:
+                _write_statistics(conn, username, statistics)
+            if add_sessions:
+                conn.execute(
+                    "INSERT INTO statistics (username, total_sessions) VALUES (?, ?) "
+                    "ON CONFLICT(username) DO UPDATE SET total_sessions = COALESCE(total_sessions, 0) + excluded.total_sessions",
+                    (username, add_sessions)
+                )
+        return True
+    except sqlite3.Error as e:
+        print(f"Error updating user {username} in the database: {e}")
+        return False
+
+
+def record_answers(username: str, answers: list) -> List[bool]:
+    """
+    Record a batch of (kind, key, result) answers in one transaction: each updates its item's
+    answer statistics and the user's global statistics with single-row UPDATEs (the spaced
+    repetition state is only reviewed once per quiz, see UserSession.review_item). Items are
+    matched on any of their lookup columns (e.g. letter char, name or sound).
+    If it raises sqlite3.Error, none of the answers were recorded.
+    Returns, for each answer, whether a matching item existed.
+    """
+    conn = get_connection()
+    with conn:
+        return [_record_answer_row(conn, username, kind, key, result) for kind, key, result in answers]
+
+
+def _record_answer_row(conn: sqlite3.Connection, username: str, kind: str, key: str, result: bool) -> bool:
+    spec = ITEM_TABLES[kind]
+    table = spec["table"]
+    where = " OR ".join(f"{col} = ?" for col in spec["lookup"])
+    row = conn.execute(
+        f"SELECT rowid, last_20_answers FROM {table} WHERE username = ? AND ({where}) ORDER BY position LIMIT 1",
+        [username] + [key] * len(spec["lookup"])
+    ).fetchone()
+    if row is None:
+        return False
+
+    last_20 = json.loads(row["last_20_answers"]) if row["last_20_answers"] else []
+    last_20.append(result)
+    if len(last_20) > 20:
+        last_20 = last_20[-20:]
+    conn.execute(
+        f"UPDATE {table} SET times_learned = COALESCE(times_learned, 0) + 1, "
+        f"times_correct = COALESCE(times_correct, 0) + ?, last_20_answers = ? WHERE rowid = ?",
+        (1 if result else 0, json.dumps(last_20), row["rowid"])
+    )
+
+    conn.execute(
+        "INSERT INTO statistics (username, total_sessions, total_questions, total_correct) VALUES (?, NULL, 1, ?) "
+        "ON CONFLICT(username) DO UPDATE SET total_questions = COALESCE(total_questions, 0) + 1, "
+        "total_correct = COALESCE(total_correct, 0) + excluded.total_correct",
+        (username, 1 if result else 0)
+    )
+    return True
+
+
+def count_items(username: str, kind: str) -> dict:
+    """Returns {"total": n, "seen": m} for the user's items of the given kind."""
+    table = ITEM_TABLES[kind]["table"]
+    row = get_connection().execute(
+        f"SELECT COUNT(*) AS total, COALESCE(SUM(is_seen = 1), 0) AS seen FROM {table} WHERE username = ?",
+        (username,)
+    ).fetchone()
+    return {"total": row["total"], "seen": row["seen"]}
+
+
+def count_seen(username: str, kind: str) -> int:
+    """Returns the number of the user's items of the given kind marked as seen (uses the is_seen index)."""
+    table = ITEM_TABLES[kind]["table"]
+    row = get_connection().execute(
+        f"SELECT COUNT(*) FROM {table} WHERE username = ? AND is_seen = 1", (username,)
+    ).fetchone()
+    return row[0]
+
+
+def words_can_learn(username: str) -> list:
+    """
+    Returns the user's words whose spelling only uses letters the user has seen.
+    """
+    if SPELLED is None:
+        return []
+    words = ITEM_TABLES[SPELLED.kind]
+    word, letter = words["key"], SPELLED_WITH["key"]
+    rows = get_connection().execute(
+        f"""
+        SELECT w.* FROM {words["table"]} w
+        WHERE w.username = ?
+          AND NOT EXISTS (
+              SELECT 1 FROM word_letters wl
+              WHERE wl.username = w.username AND wl.{word} = w.{word}
+                AND NOT EXISTS (
+                    SELECT 1 FROM {SPELLED_WITH["table"]} l
+                    WHERE l.username = wl.username AND l.{letter} = wl.{letter} AND l.is_seen = 1
+                )
+          )
+        ORDER BY w.position
+        """,
+        (username,)
+    )
+    return [_row_to_item(row, words["columns"]) for row in rows]
+
+
+def migrate_json_users(user_folder: str) -> int:
+    """
+    Import every <username>.json document found in user_folder into the database.
+    Existing database rows for those users are replaced. Returns the number of users imported.
+    """
+    imported = 0
+    for filename in sorted(os.listdir(user_folder)):
+        if not filename.endswith(".json"):
+            continue
+        username = filename[:-len(".json")]
+        try:
+            with open(os.path.join(user_folder, filename), "rb") as f:
+                document = serializer.loads(f.read())
+        except (ValueError, OSError) as e:
+            print(f"Skipping {filename}: {e}")
+            continue
+        # sparse progress documents are merged with the shared catalog first
+        if write_document(username, expand_progress(document)):
+            imported += 1
+            print(f"Imported {username}")
+    return imported
+
+
+if __name__ == "__main__":
+    # Usage: python -m src.utils.user_store_sqlite migrate [user_folder]
+    if len(sys.argv) < 2 or sys.argv[1] != "migrate":
+        print("Usage: python -m src.utils.user_store_sqlite migrate [user_folder]")
+        sys.exit(1)
+    folder = sys.argv[2] if len(sys.argv) > 2 else os.path.join(os.path.dirname(__file__), '..', 'data', 'user_data', 'user_data')
+    count = migrate_json_users(folder)
+    print(f"Imported {count} user(s) into {os.path.abspath(DB_FILE)}")
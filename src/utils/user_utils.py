@@ -1,59 +1,82 @@
-import csv
 import os
-import json
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import ExitStack
+from src.utils.user_cache import UserDocumentCache
+from src.utils.write_queue import WriteQueue
+from src.utils.scheduler import ItemScheduler, LearnableWords
+from src.utils.spaced_repetition import DueQueue, review
+from src.utils.progress_table import ProgressTable
+from src.utils import user_store_sqlite
+from src.utils import answer_log
+from src.utils import serializer
+from src.utils.credential_store import get_credential_index
+from src.utils.file_utils import atomic_write, file_lock
+from src.utils.item_schema import ItemSchema, get_schema, spelled_schema
+from src.utils.catalog import DEFAULT_LANGUAGE, compact_progress, expand_progress, get_compiled_catalog, new_progress_document
 
 # Define the CSV file path relative to this file
 DATA_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'user_data', 'secure.csv')
 USER_FOLDER = os.path.join(os.path.dirname(__file__), '..', 'data', 'user_data', "user_data")
 
+# Where user progress is stored: "json" (one file per user in USER_FOLDER) or "sqlite" (user_store_sqlite.DB_FILE)
+STORAGE_BACKEND = os.environ.get("USER_STORAGE_BACKEND", "json")
+
+# How user files are written (json backend): "json" (indented), "compact" or "binary".
+# Files in any format are read back, so this can be changed without converting existing files
+# (python -m src.utils.serializer convert <format> converts them all at once).
+USER_FILE_FORMAT = os.environ.get("USER_FILE_FORMAT", serializer.DEFAULT_FORMAT)
+
+# In-process user document cache settings (json backend)
+USER_CACHE_MAX_ENTRIES = 64
+USER_CACHE_FLUSH_INTERVAL = 5.0  # seconds between background flushes of dirty documents
+
+# Answer log settings (json backend): once a user's log grows past this size it is folded
+# into the snapshot document (while the user's lock is held)
+ANSWER_LOG_COMPACT_BYTES = 16 * 1024
+
+# Answers recorded by UserSession are queued and written by a background thread, coalescing
+# the answers of each user given within this many seconds into one write
+ANSWER_QUEUE_MAX_DELAY = 0.2
+
+# statistics entry holding the number of seen items of each kind, see _seen_counts
+SEEN_COUNTS_KEY = "seen_items"
+
 
 def create_user(username: str, password: str) -> bool:
     """
     Create a new username-password pair if it does not exist.
     Returns True if the new user is created, False if the username already exists.
     """
-    if user_exists(username):
+    # usernames name the user's files, so they must not hold path components
+    if not _is_safe_username(username):
+        return False
+    # store a salted hash of the password (the index refuses existing usernames)
+    if user_exists(username) or not get_credential_index(DATA_FILE).add(username, password):
         return False
-
-    # Ensure the directory for the CSV file exists
-    os.makedirs(os.path.dirname(DATA_FILE), exist_ok=True)
-    
-    # If file doesn't exist, create it and optionally add a header
-    file_exists = os.path.isfile(DATA_FILE)
-    with open(DATA_FILE, mode='a', newline='', encoding='utf-8') as csvfile:
-        writer = csv.writer(csvfile)
-        if not file_exists:
-            writer.writerow(['username', 'password'])
-        writer.writerow([username, password])
     
-    # copy the data from the thai.json file and create a new user json file
-    default_user_data_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'language_data', 'thai_data', 'thai.json')
-    new_user_data_path = os.path.join(USER_FOLDER, f"{username}.json")
-    os.makedirs(USER_FOLDER, exist_ok=True)
-    try:
-        with open(default_user_data_path, 'r', encoding='utf-8') as src_file:
-            data = json.load(src_file)
-        with open(new_user_data_path, 'w', encoding='utf-8') as dest_file:
-            json.dump(data, dest_file, ensure_ascii=False, indent=4)
-    except (json.JSONDecodeError, OSError):
-        pass  # If copying fails, we still created the user in CSV
+    # a new user starts with no progress: the shared catalog provides every item's static data
+    data = new_progress_document()
+    if STORAGE_BACKEND == "sqlite":
+        user_store_sqlite.write_document(username, expand_progress(data))
+    else:
+        with user_lock(username):
+            _user_cache.invalidate(username)
+            answer_log.clear(_user_logpath(username))
+            _write_user_file(username, data)  # if this fails, we still created the user in CSV
     return True
 
 
 def check_user(username: str, password: str) -> bool:
     """
-    Check if the username-password pair exists in the CSV file.
-    Returns True if a matching pair is found, False otherwise.
+    Check if the username-password pair matches the credentials in the CSV file.
+    Uses the in-memory credential index and a constant-time salted hash comparison.
+    Returns True if the password is correct, False otherwise.
     """
-    if not os.path.isfile(DATA_FILE):
-        return False
-
-    with open(DATA_FILE, mode='r', newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            if row['username'] == username and row['password'] == password:
-                return True
-    return False
+    return get_credential_index(DATA_FILE).verify(username, password)
 
 
 def user_exists(username: str) -> bool:
@@ -61,45 +84,242 @@ def user_exists(username: str) -> bool:
     Helper function to check if a username exists in the CSV file.
     Returns True if the username is found, False otherwise.
     """
-    if not os.path.isfile(DATA_FILE):
-        return False
+    return get_credential_index(DATA_FILE).exists(username)
 
-    with open(DATA_FILE, mode='r', newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            if row['username'] == username:
-                return True
-    return False
 
+def _is_safe_username(username) -> bool:
+    return (isinstance(username, str) and username.strip() == username and username not in ("", ".", "..")
+            and not any(sep in username for sep in ("/", "\\", "\0")))
 
-def read_user_json(username: str) -> dict:
+
+def is_known_user(username) -> bool:
+    """True if username is a registered user whose name can be used in file names."""
+    return _is_safe_username(username) and user_exists(username)
+
+
+def _user_filepath(username: str) -> str:
+    return os.path.join(USER_FOLDER, f"{username}.json")
+
+
+def _user_logpath(username: str) -> str:
+    return os.path.join(USER_FOLDER, f"{username}.log")
+
+
+def user_lock(username: str):
     """
-    Read the JSON file for the given username from USER_FOLDER and return its contents as a dict.
-    Returns an empty dict if the file does not exist or cannot be read/parsed.
+    Context manager holding the user's advisory lock (USER_FOLDER/<username>.lock).
+    Wrap every read-modify-write of a user's data in it: it excludes other threads and other
+    worker processes, and is re-entrant within a thread.
+    Raises ValueError if username is not a known user (see is_known_user): usernames come from
+    the browser, and must never create lock files for non-users or point outside USER_FOLDER.
     """
-    filepath = os.path.join(USER_FOLDER, f"{username}.json")
+    if not is_known_user(username):
+        raise ValueError(f"Unknown user: {username!r}")
+    return file_lock(os.path.join(USER_FOLDER, f"{username}.lock"))
+
+
+def _user_file_token(username: str):
+    """
+    Returns a cheap fingerprint (mtime, size, answer log size) of the user's files, or None if
+    the document does not exist. Used by the cache to detect writes made by other processes.
+    """
+    try:
+        stat = os.stat(_user_filepath(username))
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, answer_log.log_size(_user_logpath(username)))
+
+
+def _language(user_data: dict) -> str:
+    return user_data.get("language", DEFAULT_LANGUAGE)
+
+
+def _schemas(user_data: dict) -> dict:
+    """Returns {kind: schema} of the item types of the user's language (see item_schema)."""
+    return get_compiled_catalog(_language(user_data)).schemas
+
+
+def _schema(user_data: dict, kind: str) -> ItemSchema:
+    """Returns the schema of the given kind of the user's language; raises KeyError for unknown kinds."""
+    return get_schema(kind, _language(user_data))
+
+
+def _find_item(user_data: dict, kind: str, key: str):
+    """
+    Returns the first item of the given kind ("letter" or "word") matching key on any of its
+    identifying fields, or None.
+    """
+    schema = _schema(user_data, kind)
+    items = user_data.get(schema.section, [])
+
+    # user documents list the catalog's items in catalog order, so the catalog ID is the index
+    catalog = get_compiled_catalog(_language(user_data))
+    item_id = catalog.find(kind, key)
+    if item_id is not None and item_id < len(items):
+        item = items[item_id]
+        if isinstance(item, dict) and item.get(schema.key_field) == catalog.key_of(kind, item_id):
+            return item
+
+    for item in items:
+        if any(item.get(field) == key for field in schema.lookup_fields):
+            return item
+    return None
+
+
+def _seen_counts(user_data: dict) -> dict:
+    """
+    Returns the user's {kind: number of seen items}, kept in their statistics (SEEN_COUNTS_KEY) and
+    updated whenever an item is marked as seen, so dashboards read it without going over the items.
+    Counts missing from the document (written before the counters, or with replaced statistics)
+    are computed once here.
+    """
+    statistics = user_data.setdefault("statistics", {})
+    counts = statistics.get(SEEN_COUNTS_KEY)
+    if not isinstance(counts, dict):
+        counts = statistics[SEEN_COUNTS_KEY] = {}
+    for kind, schema in _schemas(user_data).items():
+        if not isinstance(counts.get(kind), int):
+            items = user_data.get(schema.section, [])
+            counts[kind] = sum(1 for item in items if isinstance(item, dict) and item.get("is_seen") == True) if isinstance(items, list) else 0
+    return counts
+
+
+def _apply_answer(user_data: dict, item: dict, result: bool) -> None:
+    """
+    Record one answer on the given item of user_data and in the user's global statistics.
+    Only the counters change: the item's spaced repetition schedule is reviewed once per quiz
+    (UserSession.review_item), not on each of the quiz's answers.
+    """
+    item["times_learned"] = item.get("times_learned", 0) + 1
+    if result:
+        item["times_correct"] = item.get("times_correct", 0) + 1
+    # update last_20_answers
+    last_20 = item.get("last_20_answers", [])
+    last_20.append(result)
+    if len(last_20) > 20:
+        last_20 = last_20[-20:]
+    item["last_20_answers"] = last_20
+
+    # update global user statistics
+    user_statistics = user_data.setdefault("statistics", {})
+    user_statistics["total_questions"] = user_statistics.get("total_questions", 0) + 1
+    user_statistics["total_correct"] = user_statistics.get("total_correct", 0) + (1 if result else 0)
+
+
+def _read_user_file(username: str):
+    """
+    Read and parse the user's snapshot from disk (in any serializer format), merge its sparse progress with the shared
+    catalog, then replay any answers from the answer log that have not been folded into the
+    snapshot yet.
+    Returns None if the file does not exist or cannot be read/parsed.
+    """
+    filepath = _user_filepath(username)
     if not os.path.isfile(filepath):
-        return {}
+        return None
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, OSError):
+        with open(filepath, 'rb') as f:
+            user_data = serializer.loads(f.read())
+    except (ValueError, OSError):
+        return None
+
+    if isinstance(user_data, dict):
+        user_data = expand_progress(user_data)
+        for seq, kind, key, result, _ in answer_log.read_entries(_user_logpath(username), user_data.get("answer_log_seq", 0)):
+            item = _find_item(user_data, kind, key) if kind in _schemas(user_data) else None
+            if item is not None:
+                _apply_answer(user_data, item, result)
+            user_data["answer_log_seq"] = seq
+    return user_data
+
+
+def _write_user_file(username: str, user_data: dict) -> bool:
+    """
+    Serialise the given user_data dict to the user's file on disk (in USER_FILE_FORMAT), then compact the
+    answer log: answers up to the document's answer_log_seq are now part of the snapshot.
+    Only the fields that differ from the shared catalog are written (see catalog.compact_progress).
+    Returns True if the data was written successfully, False otherwise.
+    """
+    data = serializer.dumps(compact_progress(user_data), USER_FILE_FORMAT)
+    with user_lock(username):
+        # written to a temporary file and renamed, so readers never see a half-written document
+        if not atomic_write(_user_filepath(username), lambda f: f.write(data), mode="wb"):
+            return False
+        answer_log.truncate_through(_user_logpath(username), user_data.get("answer_log_seq", 0))
+    return True
+
+
+_user_cache = UserDocumentCache(
+    load=_read_user_file,
+    store=_write_user_file,
+    token=_user_file_token,
+    max_entries=USER_CACHE_MAX_ENTRIES,
+    flush_interval=USER_CACHE_FLUSH_INTERVAL,
+    lock=user_lock,
+)
+
+
+def read_user_json(username: str) -> dict:
+    """
+    Return the JSON document for the given username, served from the in-process cache.
+    Answers still queued for the user are written first, so they are part of the result.
+    The returned dict is shared with the cache: call save_user_json after mutating it.
+    Returns an empty dict if the file does not exist or cannot be read/parsed.
+    """
+    _answer_queue.flush(username)
+    return _read_user_document(username)
+
+
+def _read_user_document(username: str) -> dict:
+    if STORAGE_BACKEND == "sqlite":
+        return user_store_sqlite.read_document(username) or {}
+    user_data = _user_cache.get(username)
+    if user_data is None:
         return {}
+    return user_data
+
+
+def read_user_snapshot(username: str) -> dict:
+    """
+    Return a private copy of the user's stored document (pending writes are flushed first), which
+    the caller may keep and use without holding the user's lock, unlike read_user_json's.
+    Returns an empty dict if the user has no document.
+    """
+    with user_lock(username):
+        flush_user_json(username)
+        if STORAGE_BACKEND == "sqlite":
+            return user_store_sqlite.read_document(username) or {}
+        # read back from disk rather than copied from the cache: the snapshot is the cheaper form
+        return _read_user_file(username) or {}
 
 
 def save_user_json(username: str, user_data: dict) -> bool:
     """
-    Save the given user_data dict to a JSON file for the given username in USER_FOLDER.
-    Returns True if the data was saved successfully, False otherwise.
+    Save the given user_data dict for the given username.
+    The document is updated in the cache and written to USER_FOLDER in the background;
+    use flush_user_json when the data must be on disk before continuing.
+    Returns True if the data was accepted, False otherwise.
     """
-    filepath = os.path.join(USER_FOLDER, f"{username}.json")
-    os.makedirs(USER_FOLDER, exist_ok=True)
-    try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(user_data, f, ensure_ascii=False, indent=4)
-        return True
-    except OSError:
+    if not isinstance(user_data, dict):
         return False
+    if STORAGE_BACKEND == "sqlite":
+        return user_store_sqlite.write_document(username, user_data)
+    # answers already in the log are part of the document being replaced, never replay them onto it
+    current = _user_cache.get(username)
+    if current is not None and current is not user_data:
+        user_data["answer_log_seq"] = current.get("answer_log_seq", 0)
+    return _user_cache.put(username, user_data)
+
+
+def flush_user_json(username: str = None) -> bool:
+    """
+    Write any pending changes (queued answers, then the cached document) for the given username
+    (or for every user) to disk.
+    Returns True if everything was written successfully, False otherwise.
+    """
+    flushed = _answer_queue.flush(username)
+    if STORAGE_BACKEND == "sqlite":
+        return flushed  # every sqlite write is already committed
+    return _user_cache.flush(username) and flushed
 
 
 def get_num_learned_letters(username:str) -> int:
@@ -107,12 +327,9 @@ def get_num_learned_letters(username:str) -> int:
     Reads the user's JSON file and returns the number of Thai letters marked as learned.
     Returns 0 if the file does not exist or cannot be read/parsed.
     """
-    user_data = read_user_json(username)
-    thai_letters = user_data.get("thai_letters", [])
-    if not isinstance(thai_letters, list):
-        return 0
-    learned_count = sum(1 for letter in thai_letters if letter.get("is_seen") == True)
-    return learned_count
+    if STORAGE_BACKEND == "sqlite":
+        return user_store_sqlite.count_seen(username, "letter")
+    return _seen_counts(read_user_json(username))["letter"]
 
 
 def get_num_learned_words(username:str) -> int:
@@ -120,22 +337,19 @@ def get_num_learned_words(username:str) -> int:
     Reads the user's JSON file and returns the number of Thai letters marked as learned.
     Returns 0 if the file does not exist or cannot be read/parsed.
     """
-    user_data = read_user_json(username)
-    thai_words = user_data.get("thai_words", [])
-    if not isinstance(thai_words, list):
-        return 0
-    learned_count = sum(1 for word in thai_words if word.get("is_seen") == True)
-    return learned_count
+    if STORAGE_BACKEND == "sqlite":
+        return user_store_sqlite.count_seen(username, "word")
+    return _seen_counts(read_user_json(username))["word"]
 
 
 def add_user_settings(username:str, settings: dict) -> bool:
     """
-    Adds or updates the user's settings in their JSON file.
+    Adds or updates the user's settings in their JSON file, under the user's lock (see UserSession).
     Returns True if the settings were saved successfully, False otherwise.
     """
-    user_data = read_user_json(username)
-    user_data['settings'] = settings
-    return save_user_json(username, user_data)
+    with UserSession(username) as session:
+        session.set_settings(settings)
+        return session.commit()
 
 
 def get_global_learning_statistics(username:str) -> dict:
@@ -153,10 +367,12 @@ def get_thai_letters_learning_statistics(username:str) -> dict:
     Reads the user's JSON file and returns their Thai letters learning statistics.
     Returns an empty dict if the file does not exist or cannot be read/parsed.
     """
+    if STORAGE_BACKEND == "sqlite":
+        counts = user_store_sqlite.count_items(username, "letter")
+        return {"total_letters": counts["total"], "learned_letters": counts["seen"]}
     learning_info = read_user_json(username)
-    thai_letters = learning_info.get("thai_letters", [])
-    total_letters = len(thai_letters)
-    learned_letters = sum(1 for letter in thai_letters if letter.get("is_seen") == True)
+    total_letters = len(learning_info.get(_schema(learning_info, "letter").section, []))
+    learned_letters = _seen_counts(learning_info)["letter"]
 
     return {
         "total_letters": total_letters,
@@ -169,10 +385,12 @@ def get_thai_words_learning_statistics(username:str) -> dict:
     Reads the user's JSON file and returns their Thai words learning statistics.
     Returns an empty dict if the file does not exist or cannot be read/parsed.
     """
+    if STORAGE_BACKEND == "sqlite":
+        counts = user_store_sqlite.count_items(username, "word")
+        return {"total_words": counts["total"], "learned_words": counts["seen"]}
     learning_info = read_user_json(username)
-    thai_words = learning_info.get("thai_words", [])
-    total_words = len(thai_words)
-    learned_words = sum(1 for word in thai_words if word.get("is_seen") == True)
+    total_words = len(learning_info.get(_schema(learning_info, "word").section, []))
+    learned_words = _seen_counts(learning_info)["word"]
 
     return {
         "total_words": total_words,
@@ -182,100 +400,404 @@ def get_thai_words_learning_statistics(username:str) -> dict:
 
 def add_user_statistics(username:str, statistics: dict) -> bool:
     """
-    Adds or updates the user's learning statistics in their JSON file.
+    Adds or updates the user's learning statistics in their JSON file, under the user's lock (see UserSession).
     Returns True if the statistics were saved successfully, False otherwise.
     """
     print("Writing global user statistics for user", username, statistics)
-    user_data = read_user_json(username)
-    user_data['statistics'] = statistics
-    return save_user_json(username, user_data)
+    with UserSession(username) as session:
+        session.set_statistics(statistics)
+        return session.commit()
 
 
-def update_user_information_letter(username:str, letter_to_update:str, result:bool) -> bool:
-    # update stats
-    user_data = read_user_json(username)
-    letters = user_data.get("thai_letters", [])
-
-    question_letter = None
-    for letter in letters:
-        if letter.get("letter_char") == letter_to_update or letter.get("letter_name") == letter_to_update or letter.get("letter_sound") == letter_to_update:
-            question_letter = letter
-            break
-    if question_letter is not None:
-        question_letter["times_learned"] = question_letter.get("times_learned", 0) + 1
-        if result:
-            question_letter["times_correct"] = question_letter.get("times_correct", 0) + 1
-        # update last_20_answers
-        last_20 = question_letter.get("last_20_answers", [])
-        last_20.append(result)
-        if len(last_20) > 20:
-            last_20 = last_20[-20:]
-        question_letter["last_20_answers"] = last_20
-    else:
-        return False
-    
-    user_data["thai_letters"] = letters
-    saved = save_user_json(username, user_data)
+def _record_answer(username: str, kind: str, key: str, result: bool, user_data: dict = None) -> bool:
+    """
+    Record one answer for the item of the given kind matching key.
+    The answer is appended to the user's answer log (a few dozen bytes) and applied to the cached
+    document; the full document is only rewritten when the log is compacted.
+    If user_data is given (an already loaded document) the answer is applied to it as well.
+    Returns False if no matching item exists.
+    """
+    return _record_answers(username, [(kind, key, result)], user_data) == 1
 
-    # update global user statistics
-    user_statistics = get_global_learning_statistics(username)
-    user_statistics["total_questions"] = user_statistics.get("total_questions", 0) + 1
-    user_statistics["total_correct"] = user_statistics.get("total_correct", 0) + (1 if result else 0)
-    add_user_statistics(username, user_statistics)
 
-    return True
+def _record_answers(username: str, answers: list, user_data: dict = None) -> int:
+    """
+    Record a batch of (kind, key, result) answers for one user with a single log append (or a
+    single sqlite transaction). Answers whose item does not exist are skipped.
+    Returns the number of answers recorded, or -1 if writing them failed (then none were).
+    """
+    now = int(time.time())
+    if STORAGE_BACKEND == "sqlite":
+        # UserSession.commit rewrites every row of the user, so the UPDATEs must not run between
+        # another session's read and its commit
+        with user_lock(username):
+            try:
+                matched = user_store_sqlite.record_answers(username, answers)
+            except sqlite3.Error as e:
+                print(f"Error recording {len(answers)} answer(s) of user {username} in the database: {e}")
+                return -1
+            for (kind, key, result), found in zip(answers, matched):
+                item = _find_item(user_data, kind, key) if found and user_data is not None else None
+                if item is not None:
+                    _apply_answer(user_data, item, result)
+                    _update_user_indexes(username, user_data, kind, item)
+        return sum(matched)
+
+    with user_lock(username):
+        # under the lock the cached document is revalidated, so the sequence number is current
+        if user_data is None:
+            user_data = _read_user_document(username)
+        seq = user_data.get("answer_log_seq", 0)
+        entries = []
+        for kind, key, result in answers:
+            item = _find_item(user_data, kind, key)
+            if item is not None:
+                seq += 1
+                entries.append((item, (seq, kind, key, result)))
+        if not entries:
+            return 0
+
+        logpath = _user_logpath(username)
+        if not answer_log.append_answers(logpath, [entry for _, entry in entries], now):
+            return -1
+        for item, (_, kind, _, result) in entries:
+            _apply_answer(user_data, item, result)
+            _update_user_indexes(username, user_data, kind, item)
+        user_data["answer_log_seq"] = seq
+
+        if answer_log.log_size(logpath) > ANSWER_LOG_COMPACT_BYTES:
+            # fold the log into the snapshot while we hold the lock
+            _user_cache.put(username, user_data)
+            _user_cache.flush(username)
+        else:
+            _user_cache.revalidate(username)
+    return len(entries)
+
+
+def _process_queued_answers(username: str, answers: list) -> bool:
+    # False makes the queue keep the batch and retry it; answers without a matching item are
+    # dropped, retrying would not make the item appear
+    return _record_answers(username, answers) >= 0
+
+
+_answer_queue = WriteQueue(
+    process=_process_queued_answers,
+    lock=user_lock,
+    max_delay=ANSWER_QUEUE_MAX_DELAY,
+)
 
 
-def update_user_information_word(username:str, word_to_update:str, result:bool) -> bool:
-    # update stats
-    user_data = read_user_json(username)
-    words = user_data.get("thai_words", [])
-
-    question_word = None
-    for word in words:
-        if word.get("word") == word_to_update or word.get("meaning") == word_to_update or word.get("pronunciation") == word_to_update:
-            question_word = word
-            break
-    if question_word is not None:
-        question_word["times_learned"] = question_word.get("times_learned", 0) + 1
-        if result:
-            question_word["times_correct"] = question_word.get("times_correct", 0) + 1
-        # update last_20_answers
-        last_20 = question_word.get("last_20_answers", [])
-        last_20.append(result)
-        if len(last_20) > 20:
-            last_20 = last_20[-20:]
-        question_word["last_20_answers"] = last_20
-    else:
-        return False
-    
-    user_data["thai_words"] = words
-    saved = save_user_json(username, user_data)
+def update_user_information_letter(username:str, letter_to_update:str, result:bool) -> bool:
+    return _record_answer(username, "letter", letter_to_update, result)
 
-    # update global user statistics
-    user_statistics = get_global_learning_statistics(username)
-    user_statistics["total_questions"] = user_statistics.get("total_questions", 0) + 1
-    user_statistics["total_correct"] = user_statistics.get("total_correct", 0) + (1 if result else 0)
-    add_user_statistics(username, user_statistics)
 
-    return True
+def update_user_information_word(username:str, word_to_update:str, result:bool) -> bool:
+    return _record_answer(username, "word", word_to_update, result)
 
 
 def words_can_learn(username:str) -> list:
-    user_data = read_user_json(username)
+    if STORAGE_BACKEND == "sqlite":
+        return user_store_sqlite.words_can_learn(username)
+
+    return _learnable_words(username, read_user_json(username)).learnable()
+
+
+# Per-user indexes over the user's items (schedulers, learnable words), kept while the user's
+# cached document object stays the same.
+# username -> (document, {(kind, name): index}); index.update(item) is called whenever an item
+# of that kind is changed through UserSession
+_user_indexes: "OrderedDict[str, tuple]" = OrderedDict()
+_user_indexes_lock = threading.Lock()
+
+
+def _get_user_index(username: str, user_data: dict, kind: str, name: str, build):
+    with _user_indexes_lock:
+        entry = _user_indexes.get(username)
+        if entry is None or entry[0] is not user_data:
+            # first use, or the document was reloaded/replaced: start over
+            entry = _user_indexes[username] = (user_data, {})
+        _user_indexes.move_to_end(username)
+        while len(_user_indexes) > USER_CACHE_MAX_ENTRIES:
+            _user_indexes.popitem(last=False)
+    index = entry[1].get((kind, name))
+    if index is None:
+        index = entry[1][(kind, name)] = build()
+    return index
+
+
+def _update_user_indexes(username: str, user_data: dict, kind: str, item: dict) -> None:
+    with _user_indexes_lock:
+        entry = _user_indexes.get(username)
+    if entry is None or entry[0] is not user_data:
+        return
+    for (indexed_kind, _), index in entry[1].items():
+        if indexed_kind == kind:
+            index.update(item)
+
+
+def _get_scheduler(username: str, user_data: dict, kind: str, priority_key: str):
+    def build():
+        schema = _schema(user_data, kind)
+        items = (it for it in user_data.get(schema.section, []) if isinstance(it, dict))
+        if priority_key == "sr_due":
+            return DueQueue(items, schema.unique_keys)
+        return ItemScheduler(items, priority_key, schema.unique_keys)
+    return _get_user_index(username, user_data, kind, priority_key, build)
+
+
+def _progress_table(username: str, user_data: dict, kind: str) -> ProgressTable:
+    def build():
+        return ProgressTable(user_data.get(_schema(user_data, kind).section, []))
+    return _get_user_index(username, user_data, kind, "progress_table", build)
+
+
+def _learnable_words(username: str, user_data: dict) -> LearnableWords:
+    # registered under the kind words are spelled with: it is updated when a letter becomes seen
+    word_schema = spelled_schema(_language(user_data))
+    letter_schema = _schema(user_data, word_schema.spelling_kind)
+
+    def build():
+        letters = [it for it in user_data.get(letter_schema.section, []) if isinstance(it, dict)]
+        words = user_data.get(word_schema.section, [])
+        return LearnableWords(letters, words, word_schema, letter_schema, get_compiled_catalog(_language(user_data)))
+    return _get_user_index(username, user_data, letter_schema.kind, "learnable_words", build)
+
+
+class UserSession:
+    """
+    Unit of work over one user's document.
+    The document is loaded on first use, together with the user's lock, which is then held until
+    the block ends: changes made through the mutators below are committed with a single
+    synchronous save on exit (nothing is saved if the block raises or nothing changed), so
+    concurrent sessions from other threads or worker processes never interleave.
+    Answers given before the document is loaded (e.g. a question callback that only records the
+    answer) are queued for the background writer instead, so the callback never waits on disk.
+    With the sqlite backend only what changed is written: the rows of the changed items, the
+    settings or statistics, each with a single-row UPDATE (see user_store_sqlite.update_rows);
+    only replace() rewrites the whole document.
+    Unknown users (e.g. "Guest" or a tampered username store) get an empty document that is
+    never written.
+    reads and writes count the storage operations the session performed (see io_stats).
+
+        with UserSession(username) as session:
+            session.record_answer("letter", "ก", True)
+            session.increment_sessions()
+    """
 
-    user_letters = user_data.get("thai_letters", [])
-    user_words = user_data.get("thai_words", [])
+    def __init__(self, username: str):
+        self.username = username
+        self.reads = 0
+        self.writes = 0
+        self._data = None
+        self._dirty = False
+        self._known = True
+        self._stack = ExitStack()
+        # what changed since the last commit, for the sqlite backend's row updates
+        self._changed_items = {}  # id(item) -> (kind, item)
+        self._changed_parts = set()  # "settings", "statistics" or "document" (replaced whole)
+        self._added_sessions = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self.commit()
+            elif STORAGE_BACKEND != "sqlite":
+                # drop any half-applied in-place changes from the cached document
+                _user_cache.invalidate(self.username)
+        finally:
+            self._stack.close()
+        return False
 
-    learned_letters = [let.get("letter_char") for let in user_letters if let.get("is_seen", False) == True]
+    def load(self) -> dict:
+        if self._data is None and not is_known_user(self.username):
+            self._data = {}
+            self._known = False
+        if self._data is None:
+            self._stack.enter_context(user_lock(self.username))
+            if STORAGE_BACKEND != "sqlite":
+                # pending background writes of this process go first, then reads see the latest file
+                _user_cache.flush(self.username)
+            self._data = read_user_json(self.username)
+            self.reads += 1
+        return self._data
+
+    @property
+    def data(self) -> dict:
+        return self.load()
+
+    @property
+    def language(self) -> str:
+        """The language the user learns, whose catalog their items come from."""
+        return _language(self.data)
+
+    @property
+    def settings(self) -> dict:
+        return self.data.get("settings", {})
+
+    @property
+    def statistics(self) -> dict:
+        return self.data.get("statistics", {})
+
+    def items(self, kind: str) -> list:
+        """Returns the user's items of the given kind ("letter" or "word")."""
+        return self.data.get(_schema(self.data, kind).section, [])
+
+    def count_items(self, kind: str) -> dict:
+        """Returns {"total": n, "seen": m} for the user's items of the given kind, from the kept counters."""
+        return {"total": len(self.items(kind)), "seen": _seen_counts(self.data)[kind]}
+
+    def progress_table(self, kind: str) -> ProgressTable:
+        """Returns the column view of the user's items of the given kind, for batch statistics."""
+        return _progress_table(self.username, self.data, kind)
+
+    def find_item(self, kind: str, key: str):
+        """Returns the user's item of the given kind matching key, or None."""
+        return _find_item(self.data, kind, key)
+
+    def learnable_words(self) -> list:
+        """Returns the words whose spelling only uses letters the user has seen."""
+        return _learnable_words(self.username, self.data).learnable()
+
+    def count_learnable_words(self) -> int:
+        """Returns the number of words whose spelling only uses letters the user has seen."""
+        return len(_learnable_words(self.username, self.data))
+
+    def pick_items(self, kind: str, n: int, is_seen: bool = False, priority_key: str = None, allowed=None,
+                   rng: random.Random = random) -> list:
+        """
+        Returns up to n items of the given kind to study, chosen at random among the lowest
+        priority_key values (default: the kind's priority field) with is_seen equal to is_seen.
+        See ItemScheduler.pick; the scheduler is kept for the user between sessions.
+        """
+        scheduler = _get_scheduler(self.username, self.data, kind, priority_key or _schema(self.data, kind).priority_key)
+        return scheduler.pick(n, is_seen=is_seen, allowed=allowed, rng=rng)
+
+    def pick_due_items(self, kind: str, n: int) -> list:
+        """
+        Returns up to n seen items of the given kind to practice: the most overdue for review
+        first (see spaced_repetition), then the ones due soonest.
+        """
+        return _get_scheduler(self.username, self.data, kind, "sr_due").pick(n)
+
+    def record_answer(self, kind: str, key: str, result: bool) -> bool:
+        """
+        Record one answer for the item matching key.
+        If the document is not loaded the answer is queued and True is returned; otherwise it is
+        recorded right away and applied to the document. Returns False if no item matches.
+        """
+        if not is_known_user(self.username):
+            return False
+        if self._data is None:
+            _answer_queue.submit(self.username, (kind, key, result))
+            return True
+        recorded = _record_answer(self.username, kind, key, result, user_data=self._data)
+        if recorded:
+            self.writes += 1
+        return recorded
+
+    def mark_seen(self, kind: str, key: str) -> bool:
+        """Mark the item matching key as seen. Returns False if no item matches."""
+        item = _find_item(self.data, kind, key)
+        if item is None:
+            return False
+        if item.get("is_seen") != True:
+            # counted before the flag changes, so a count computed now does not include the item
+            seen_counts = _seen_counts(self._data)
+            item["is_seen"] = True
+            seen_counts[kind] += 1
+            self._item_changed(kind, item)
+        return True
 
-    final_words = []
-    for word in user_words:
-        know_all_letters = True
-        for let in word.get("spelling"):
-            if let not in learned_letters:
-                know_all_letters = False
-        if know_all_letters:
-            final_words.append(word)
-    
-    return final_words
+    def bump_priority(self, kind: str, key: str, amount: int = 1) -> bool:
+        """Raise the priority value of the item matching key, so it is picked less often. Returns False if no item matches."""
+        item = _find_item(self.data, kind, key)
+        if item is None:
+            return False
+        priority_key = _schema(self.data, kind).priority_key
+        item[priority_key] = max(0, item.get(priority_key, 0) + amount)
+        self._item_changed(kind, item)
+        return True
+
+    def review_item(self, kind: str, key: str, result: bool, now: float = None) -> bool:
+        """
+        Review the spaced repetition schedule of the item matching key with its result over a
+        whole quiz (see spaced_repetition.session_result). Returns False if no item matches.
+        """
+        item = _find_item(self.data, kind, key)
+        if item is None:
+            return False
+        item.update(review(item, result, now))
+        self._item_changed(kind, item)
+        return True
+
+    def _item_changed(self, kind: str, item: dict) -> None:
+        self._changed_items[id(item)] = (kind, item)
+        self._dirty = True
+        _update_user_indexes(self.username, self._data, kind, item)
+
+    def increment_sessions(self) -> None:
+        """Count one more finished learning session in the user's statistics."""
+        statistics = self.data.setdefault("statistics", {})
+        statistics["total_sessions"] = statistics.get("total_sessions", 0) + 1
+        self._added_sessions += 1
+        self._dirty = True
+
+    def set_settings(self, settings: dict) -> None:
+        """Add or update the user's settings."""
+        self.data["settings"] = settings
+        self._changed_parts.add("settings")
+        self._dirty = True
+
+    def set_statistics(self, statistics: dict) -> None:
+        """Add or update the user's learning statistics."""
+        # the seen-item counters are kept by mark_seen, not taken from the caller
+        seen_counts = _seen_counts(self.data)
+        self.data["statistics"] = {**statistics, SEEN_COUNTS_KEY: seen_counts}
+        self._changed_parts.add("statistics")
+        self._dirty = True
+
+    def replace(self, user_data: dict) -> None:
+        """Replace the whole document (e.g. with an uploaded backup)."""
+        statistics = user_data.get("statistics")
+        if isinstance(statistics, dict):
+            # counters of an uploaded document are not trusted: computed again on first use
+            statistics.pop(SEEN_COUNTS_KEY, None)
+        # takes the user's lock, so the commit cannot interleave with another session's
+        self.load()
+        self._data = user_data
+        self._changed_parts.add("document")
+        self._dirty = True
+
+    def commit(self) -> bool:
+        """Save the document if it changed. Returns False if saving failed."""
+        if not self._dirty:
+            return True
+        if not self._known:
+            return False
+        # the database keeps the items of the default language in rows (see user_store_sqlite.ITEM_TABLES)
+        if STORAGE_BACKEND == "sqlite" and "document" not in self._changed_parts and self.language == DEFAULT_LANGUAGE:
+            statistics = self._data.get("statistics") if "statistics" in self._changed_parts else None
+            saved = user_store_sqlite.update_rows(
+                self.username,
+                items=list(self._changed_items.values()),
+                settings=self._data.get("settings") if "settings" in self._changed_parts else None,
+                statistics=statistics,
+                # new statistics already hold the sessions counted in memory
+                add_sessions=self._added_sessions if statistics is None else 0,
+            )
+        else:
+            saved = save_user_json(self.username, self._data) and flush_user_json(self.username)
+        self.writes += 1
+        self._dirty = not saved
+        if saved:
+            self._changed_items.clear()
+            self._changed_parts.clear()
+            self._added_sessions = 0
+        return saved
+
+    def io_stats(self) -> dict:
+        """Storage operations performed so far, e.g. for debugging a callback's cost."""
+        return {"reads": self.reads, "writes": self.writes}
@@ -0,0 +1,128 @@
+import atexit
+import threading
+import time
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Dict, List, Optional
+
+
+class WriteQueue:
+    """
+    Background writer that coalesces queued updates per key (e.g. per username).
+    - submit() only appends the update to the key's pending batch and returns immediately.
+    - A single daemon thread hands each batch to process(key, updates) at most max_delay seconds
+      after its first update was queued, so a burst of updates costs one write.
+    - flush(key) processes the key's pending batch synchronously, for the points that need
+      durability (e.g. before reading the data back); flush() flushes every key.
+    Batches of a key are taken and processed while holding lock(key), so they are applied in
+    the order they were queued even when flush() races with the writer thread.
+    A batch whose processing fails (process returns False or raises any exception) is put back
+    ahead of the updates queued since, and retried after a delay doubling with each failure (up
+    to max_retry_delay); process must therefore leave nothing applied when it fails.
+    """
+
+    def __init__(self,
+                 process: Callable[[str, List[Any]], bool],
+                 lock: Optional[Callable[[str], ContextManager]] = None,
+                 max_delay: float = 0.2,
+                 max_retry_delay: float = 30.0):
+        self._process = process
+        self._key_lock = lock or (lambda key: nullcontext())
+        self.max_delay = max_delay
+        self.max_retry_delay = max_retry_delay
+        self._pending: Dict[str, List[Any]] = {}
+        self._queued_at: Dict[str, float] = {}
+        # key -> number of consecutive failed attempts at processing its batch
+        self._failures: Dict[str, int] = {}
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread: Optional[threading.Thread] = None
+        atexit.register(self.close)
+
+    def submit(self, key: str, update: Any) -> None:
+        """Queue one update for key; it is processed within max_delay seconds."""
+        with self._cond:
+            batch = self._pending.setdefault(key, [])
+            batch.append(update)
+            if len(batch) == 1:
+                self._queued_at[key] = time.monotonic()
+                self._cond.notify()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="write-queue", daemon=True)
+                self._thread.start()
+
+    def pending(self, key: str) -> int:
+        """Returns the number of queued, not yet processed updates for key."""
+        with self._cond:
+            return len(self._pending.get(key, ()))
+
+    def flush(self, key: Optional[str] = None) -> bool:
+        """
+        Synchronously process the pending updates of key (or of every key).
+        Returns False if processing any batch failed.
+        """
+        with self._cond:
+            keys = [key] if key is not None else list(self._pending)
+        ok = True
+        for k in keys:
+            ok = self._drain(k) and ok
+        return ok
+
+    def _due_at(self, key: str) -> float:
+        # called with self._cond held
+        failures = self._failures.get(key, 0)
+        delay = self.max_delay if not failures else min(self.max_retry_delay, self.max_delay * 2 ** failures)
+        return self._queued_at[key] + delay
+
+    def _drain(self, key: str) -> bool:
+        batch = None
+        error = None
+        try:
+            with self._key_lock(key):
+                with self._cond:
+                    batch = self._pending.pop(key, None)
+                    self._queued_at.pop(key, None)
+                if not batch:
+                    return True
+                ok = self._process(key, batch)
+        except Exception as e:
+            # whatever went wrong (a malformed document, a database error, ...), the writer thread
+            # must survive it and the batch must be kept for the retry
+            ok = False
+            error = e
+
+        with self._cond:
+            if ok:
+                self._failures.pop(key, None)
+                return True
+            # keep the failed updates, ahead of the ones queued while they were processed
+            if batch:
+                self._pending[key] = batch + self._pending.get(key, [])
+            self._queued_at[key] = time.monotonic()
+            self._failures[key] = self._failures.get(key, 0) + 1
+            self._cond.notify()  # the writer thread may be idle, waiting for a new batch
+            retry_in = self._due_at(key) - self._queued_at[key]
+            count = len(self._pending.get(key, ()))
+        print(f"Error writing {count} queued update(s) for {key}{f': {type(error).__name__}: {error}' if error else ''}, retrying in {retry_in:.1f}s")
+        return False
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._stop:
+                    self._cond.wait()
+                if self._stop:
+                    return
+                now = time.monotonic()
+                due = [k for k in self._queued_at if self._due_at(k) <= now]
+                if not due:
+                    self._cond.wait(min(self._due_at(k) for k in self._queued_at) - now)
+                    continue
+            for key in due:
+                self._drain(key)
+
+    def close(self) -> None:
+        """Stop the writer thread and process everything still queued."""
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        self.flush()
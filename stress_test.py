@@ -0,0 +1,80 @@
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+
+from src.utils import user_store_sqlite, user_utils
+from src.utils.user_utils import UserSession, flush_user_json, read_user_json
+
+# Several processes (like gunicorn workers) answer questions and finish sessions for the same user
+# at once. Every answer and every session must end up in the stored document.
+# Run with USER_STORAGE_BACKEND=sqlite to check the sqlite backend instead of the json files.
+USERNAME = "liam"
+WORKERS = 4
+ANSWERS_PER_WORKER = 300
+SESSIONS_PER_WORKER = 50
+
+
+def use_folder(folder: str) -> None:
+    user_utils.USER_FOLDER = folder
+    user_store_sqlite.DB_FILE = os.path.join(folder, "users.db")
+    # sqlite connections must not be shared with forked processes
+    user_store_sqlite._local.connections = {}
+
+
+def worker(folder: str, index: int) -> None:
+    use_folder(folder)
+    letters = [it["letter_char"] for it in read_user_json(USERNAME)["thai_letters"]]
+    for i in range(ANSWERS_PER_WORKER):
+        with UserSession(USERNAME) as session:
+            session.record_answer("letter", letters[(index + i) % len(letters)], i % 2 == 0)
+        if i % (ANSWERS_PER_WORKER // SESSIONS_PER_WORKER) == 0:
+            with UserSession(USERNAME) as session:
+                session.increment_sessions()
+                # workers mark overlapping letters, and some letters are never marked
+                session.mark_seen("letter", letters[(index * 5 + i) % (len(letters) // 2)])
+    flush_user_json()
+
+
+def main() -> int:
+    folder = tempfile.mkdtemp(prefix="stress_users_")
+    try:
+        shutil.copy(os.path.join(user_utils.USER_FOLDER, f"{USERNAME}.json"), folder)
+        use_folder(folder)
+        if user_utils.STORAGE_BACKEND == "sqlite":
+            user_store_sqlite.migrate_json_users(folder)
+        before = read_user_json(USERNAME)
+        stats_before = dict(before["statistics"])
+        learned_before = sum(it.get("times_learned", 0) for it in before["thai_letters"])
+
+        processes = [multiprocessing.Process(target=worker, args=(folder, i)) for i in range(WORKERS)]
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join()
+
+        user_utils._user_cache.invalidate(USERNAME)
+        after = read_user_json(USERNAME)
+        answers = WORKERS * ANSWERS_PER_WORKER
+        checks = {
+            "total_questions": (after["statistics"]["total_questions"] - stats_before["total_questions"], answers),
+            "total_correct": (after["statistics"]["total_correct"] - stats_before["total_correct"], answers // 2),
+            "total_sessions": (after["statistics"]["total_sessions"] - stats_before["total_sessions"], WORKERS * SESSIONS_PER_WORKER),
+            "times_learned": (sum(it.get("times_learned", 0) for it in after["thai_letters"]) - learned_before, answers),
+            # the seen count (the kept counter, or the database's count) must match the items
+            # however the sessions interleaved
+            "seen letters": (user_utils.get_num_learned_letters(USERNAME), sum(1 for it in after["thai_letters"] if it.get("is_seen") == True)),
+        }
+        failed = False
+        for name, (got, expected) in checks.items():
+            print(f"{name}: {got} (expected {expected})")
+            failed = failed or got != expected
+        print("FAILED" if failed else "OK")
+        return 1 if failed else 0
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())